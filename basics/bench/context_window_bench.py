@@ -0,0 +1,60 @@
+"""Show prompt size and per-turn latency as a chat session grows, with and without ContextWindow.
+
+Model latency is simulated as a fixed cost plus a cost per prompt token, and the summarizer
+as one extra model call, so the numbers reflect prompt size rather than a real provider.
+
+Run from the basics folder:  python -m bench.context_window_bench --turns 60
+"""
+import argparse
+import time
+
+from sidekick.context_window import ContextWindow, message_tokens
+
+
+def simulated_call_seconds(prompt_tokens, base, per_token):
+    return base + prompt_tokens * per_token
+
+
+def run(turns, budget, base, per_token, reply_words):
+    summarizer_calls = []
+
+    def summarize(summary, messages):
+        summarizer_calls.append(len(messages))
+        return f"{summary} summary of {len(messages)} messages."[-800:]
+
+    window = ContextWindow(summarize, budget=budget)
+    history = []
+    print(f"{'turn':>5} {'full prompt':>12} {'windowed':>9} {'full s':>8} {'windowed s':>11} {'fit ms':>7}")
+    for turn in range(1, turns + 1):
+        message = {"role": "user", "content": f"question {turn} " + "about the profile " * 5}
+        full_tokens = sum(message_tokens(m) for m in history + [message])
+
+        calls_before = len(summarizer_calls)
+        t = time.perf_counter()
+        summary, recent = window.fit(history)
+        fit_ms = (time.perf_counter() - t) * 1000
+        windowed_tokens = sum(message_tokens(m) for m in recent + [message]) + (len(summary) // 4 if summary else 0)
+
+        full_s = simulated_call_seconds(full_tokens, base, per_token)
+        windowed_s = simulated_call_seconds(windowed_tokens, base, per_token)
+        windowed_s += (len(summarizer_calls) - calls_before) * simulated_call_seconds(budget // 2, base, per_token)
+        if turn % max(1, turns // 15) == 0 or turn == turns:
+            print(f"{turn:>5} {full_tokens:>12} {windowed_tokens:>9} {full_s:>8.3f} {windowed_s:>11.3f} {fit_ms:>7.3f}")
+
+        history += [message, {"role": "assistant", "content": "answer " * reply_words}]
+    print(f"summarizer calls: {len(summarizer_calls)} over {turns} turns")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=60)
+    parser.add_argument("--budget", type=int, default=2000, help="history token budget")
+    parser.add_argument("--base", type=float, default=0.4, help="simulated seconds per model call")
+    parser.add_argument("--per-token", type=float, default=0.0002, help="simulated seconds per prompt token")
+    parser.add_argument("--reply-words", type=int, default=120)
+    args = parser.parse_args()
+    run(args.turns, args.budget, args.base, args.per_token, args.reply_words)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Measure tail latency of chat requests with and without hedging against a stub with slow outliers.
+
+Run from the basics folder:  python -m bench.hedge_bench --requests 300 --slow-fraction 0.05
+"""
+import argparse
+import asyncio
+import time
+
+from openai import AsyncOpenAI
+
+from bench.stats import percentile
+from bench.stubs import openai_stub
+from sidekick.llm_executor import LLMExecutor
+
+
+async def _drive(executor, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            stream = await executor.create(executor.start_turn(), model="stub", stream=True,
+                                           messages=[{"role": "user", "content": "hi"}])
+            async for _ in stream:
+                pass
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def run(label, args, hedge_percentile):
+    with openai_stub(latency=args.latency, slow_fraction=args.slow_fraction, slow_latency=args.slow_latency, seed=1) as stub:
+        client = AsyncOpenAI(base_url=stub.url, api_key="stub", max_retries=0)
+        executor = LLMExecutor(client, deadline=args.slow_latency * 3, hedge_percentile=hedge_percentile)
+        latencies = asyncio.run(_drive(executor, args.requests, args.concurrency))
+        print(f"{label:>10}: p50 {percentile(latencies, 50):.3f}s  p95 {percentile(latencies, 95):.3f}s  "
+              f"p99 {percentile(latencies, 99):.3f}s  max {max(latencies):.3f}s  "
+              f"upstream calls {len(stub.requests)}  hedges {executor.hedges} (won {executor.hedge_wins})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--slow-fraction", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    parser.add_argument("--percentile", type=float, default=90, help="hedge after this latency percentile")
+    args = parser.parse_args()
+    run("no hedge", args, None)
+    run("hedged", args, args.percentile)
+
+
+if __name__ == "__main__":
+    main()
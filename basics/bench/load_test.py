@@ -0,0 +1,209 @@
+"""Load test a basics chat app against local stub LLM, Pushover and ip-api servers.
+
+Starts the app in a subprocess pointed at the stubs, drives N concurrent Gradio client
+sessions and writes throughput, latency percentiles, time to first token and memory per
+session to bench/results/ as JSON.
+
+Run from the basics folder:
+    python -m bench.load_test --app app2.py --app-args "--workers 4" --sessions 50 --turns 3 --latency 0.5
+    python -m bench.load_test --compare bench/results/a.json bench/results/b.json
+"""
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+from bench.stats import percentile
+from bench.stubs import geo_stub, openai_stub, pushover_stub
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _rss(pid):
+    process = psutil.Process(pid)
+    return sum(p.memory_info().rss for p in [process] + process.children(recursive=True))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _wait_for_server(url, process, timeout):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited with code {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    raise TimeoutError(f"App did not start within {timeout}s")
+
+
+def _session(url, session, turns, repeat_questions, results):
+    from gradio_client import Client
+
+    client = Client(url, verbose=False)
+    for turn in range(turns):
+        start = time.perf_counter()
+        first_token = None
+        try:
+            # Unique questions by default so the answer cache doesn't flatter the numbers
+            prefix = "" if repeat_questions else f"Session {session}, "
+            job = client.submit(f"{prefix}question {turn}: what is your experience?", api_name="/chat")
+            for _ in job:
+                if first_token is None:
+                    first_token = time.perf_counter() - start
+            job.result()
+        except Exception as e:
+            results["errors"].append(str(e))
+            continue
+        latency = time.perf_counter() - start
+        results["latencies"].append(latency)
+        results["ttft"].append(first_token if first_token is not None else latency)
+
+
+def run(args):
+    with openai_stub(latency=args.latency, token_delay=args.token_delay, slow_fraction=args.slow_fraction,
+                     slow_latency=args.slow_latency, tool_calls=args.tool_calls) as llm, \
+            pushover_stub(latency=0.05) as pushover, geo_stub() as geo:
+        port = str(args.port)
+        env = dict(os.environ,
+                   GEMINI_BASE_URL=llm.url, GEMINI_API_KEY="stub",
+                   PUSHOVER_URL=pushover.url, URL=pushover.url,
+                   IP_API_URL=geo.url + "/json/{ip}",
+                   GRADIO_SERVER_PORT=port, GRADIO_ANALYTICS_ENABLED="False")
+        app_url = f"http://localhost:{port}/"
+        process = subprocess.Popen([sys.executable, args.app, *args.app_args], env=env,
+                                   stdout=subprocess.DEVNULL if not args.show_app_output else None,
+                                   stderr=subprocess.STDOUT if not args.show_app_output else None)
+        try:
+            _wait_for_server(app_url, process, args.startup_timeout)
+            idle_rss = _rss(process.pid)
+            peak_rss = idle_rss
+            results = {"latencies": [], "ttft": [], "errors": []}
+            stop = threading.Event()
+
+            def sample_memory():
+                nonlocal peak_rss
+                while not stop.wait(0.2):
+                    peak_rss = max(peak_rss, _rss(process.pid))
+
+            sampler = threading.Thread(target=sample_memory, daemon=True)
+            sampler.start()
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.sessions) as pool:
+                sessions = [pool.submit(_session, app_url, session, args.turns, args.repeat_questions, results)
+                            for session in range(args.sessions)]
+            for session, future in enumerate(sessions):
+                # A session that couldn't even connect raised before its first turn
+                if future.exception() is not None:
+                    results["errors"].append(f"session {session}: {future.exception()!r}")
+            elapsed = time.perf_counter() - start
+            stop.set()
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+        completed = len(results["latencies"])
+        report = {
+            "app": args.app,
+            "app_args": args.app_args,
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "config": {key: getattr(args, key) for key in
+                       ("sessions", "turns", "latency", "token_delay", "slow_fraction", "slow_latency", "tool_calls",
+                        "repeat_questions")},
+            "completed_turns": completed,
+            "errors": len(results["errors"]),
+            "elapsed_seconds": round(elapsed, 3),
+            "throughput_turns_per_second": round(completed / elapsed, 3) if elapsed else None,
+            "latency_seconds": {f"p{p}": percentile(results["latencies"], p, 4) for p in (50, 95, 99)},
+            "ttft_seconds": {f"p{p}": percentile(results["ttft"], p, 4) for p in (50, 95, 99)},
+            "llm_requests": len(llm.requests),
+            "notifications": len(pushover.requests),
+            "geo_lookups": len(geo.requests),
+            "idle_rss_mb": round(idle_rss / 2 ** 20, 1),
+            "peak_rss_mb": round(peak_rss / 2 ** 20, 1),
+            "memory_per_session_kb": round((peak_rss - idle_rss) / args.sessions / 1024, 1),
+        }
+        if results["errors"]:
+            report["first_errors"] = results["errors"][:5]
+    return report
+
+
+def compare(paths):
+    reports = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            reports.append(json.load(f))
+    rows = [
+        ("commit", lambda r: r["commit"]),
+        ("throughput/s", lambda r: r["throughput_turns_per_second"]),
+        ("latency p50", lambda r: r["latency_seconds"]["p50"]),
+        ("latency p95", lambda r: r["latency_seconds"]["p95"]),
+        ("latency p99", lambda r: r["latency_seconds"]["p99"]),
+        ("ttft p50", lambda r: r["ttft_seconds"]["p50"]),
+        ("ttft p99", lambda r: r["ttft_seconds"]["p99"]),
+        ("errors", lambda r: r["errors"]),
+        ("KB/session", lambda r: r["memory_per_session_kb"]),
+    ]
+    for label, value in rows:
+        cells = []
+        for report in reports:
+            v = value(report)
+            cells.append(f"{v:>12.3f}" if isinstance(v, float) else f"{str(v):>12}")
+        print(f"{label:>14} " + " ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--app-args", type=shlex.split, default=[], help='extra arguments for the app, e.g. "--workers 4"')
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub LLM seconds before the first token")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="stub LLM seconds between streamed words")
+    parser.add_argument("--slow-fraction", type=float, default=0.0)
+    parser.add_argument("--slow-latency", type=float, default=3.0)
+    parser.add_argument("--tool-calls", action="store_true", help="stub LLM requests a tool call each turn")
+    parser.add_argument("--repeat-questions", action="store_true", help="every session asks the same questions")
+    parser.add_argument("--port", type=int, default=7861)
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    parser.add_argument("--show-app-output", action="store_true")
+    parser.add_argument("--output", help="results file (default bench/results/<app>-<commit>-<time>.json)")
+    parser.add_argument("--compare", nargs="+", metavar="RESULTS", help="print saved results side by side and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{os.path.splitext(os.path.basename(args.app))[0]}-{report['commit']}-{int(time.time())}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
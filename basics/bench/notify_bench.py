@@ -0,0 +1,59 @@
+"""Compare inline requests.post notifications against the background Notifier.
+
+Run from the basics folder:  python -m bench.notify_bench --messages 200 --latency 0.2
+"""
+import argparse
+import statistics
+import time
+
+import requests
+
+from bench.stats import percentile
+from bench.stubs import pushover_stub
+from sidekick.notify import Notifier
+
+
+def _report(label, latencies, delivered_in):
+    print(f"{label:>10}: caller p50 {percentile(latencies, 50) * 1000:8.3f} ms  "
+          f"p99 {percentile(latencies, 99) * 1000:8.3f} ms  "
+          f"mean {statistics.mean(latencies) * 1000:8.3f} ms  "
+          f"all delivered in {delivered_in:6.2f} s")
+
+
+def bench_inline(messages, latency):
+    with pushover_stub(latency) as stub:
+        latencies = []
+        start = time.perf_counter()
+        for i in range(messages):
+            t = time.perf_counter()
+            requests.post(stub.url, data={"token": "t", "user": "u", "message": f"message {i}"})
+            latencies.append(time.perf_counter() - t)
+        _report("inline", latencies, time.perf_counter() - start)
+
+
+def bench_notifier(messages, latency, batch_window):
+    with pushover_stub(latency) as stub:
+        notifier = Notifier(stub.url, "t", "u", batch_window=batch_window)
+        latencies = []
+        start = time.perf_counter()
+        for i in range(messages):
+            t = time.perf_counter()
+            notifier.send(f"message {i}")
+            latencies.append(time.perf_counter() - t)
+        notifier.flush(timeout=60)
+        _report("notifier", latencies, time.perf_counter() - start)
+        print(f"{'':>10}  {len(stub.requests)} HTTP posts for {messages} messages")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="stub response delay in seconds")
+    parser.add_argument("--batch-window", type=float, default=0.5)
+    args = parser.parse_args()
+    bench_inline(args.messages, args.latency)
+    bench_notifier(args.messages, args.latency, args.batch_window)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Measure cold start of the chat app: wall time to a built app and where import time goes.
+
+Runs `python -X importtime -m sidekick <args> --dry-run` a few times in fresh interpreters,
+then reports the median wall time, the slowest packages to import and any modules that
+should have stayed unloaded, such as pypdf when the profile cache is warm. With
+--max-seconds the run fails when the median is over budget, so it can gate CI.
+
+Run from the basics folder:
+    python -m bench.startup_bench --mode gradio --runs 5
+    python -m bench.startup_bench --mode fastapi --max-seconds 6
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|\s+(\S+)")
+
+# Modules each mode should never load once the profile cache is warm
+UNEXPECTED = {
+    "gradio": ("pypdf", "uvicorn", "sidekick.serving", "sidekick.web"),
+    "fastapi": ("pypdf",),
+}
+
+
+def _parse_importtime(stderr):
+    """Import time per top-level package as {package: self microseconds}, and every module imported."""
+    packages, modules = {}, set()
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_time, _, module = match.groups()
+        modules.add(module)
+        package = module.split(".")[0]
+        packages[package] = packages.get(package, 0) + int(self_time)
+    return packages, modules
+
+
+def run_once(mode, extra_args):
+    env = dict(os.environ, GEMINI_API_KEY=os.getenv("GEMINI_API_KEY", "stub"), GRADIO_ANALYTICS_ENABLED="False")
+    command = [sys.executable, "-X", "importtime", "-m", "sidekick", "--mode", mode, "--notify", "none",
+               "--dry-run", *extra_args]
+    start = time.perf_counter()
+    result = subprocess.run(command, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} failed:\n{result.stderr[-2000:]}")
+    packages, modules = _parse_importtime(result.stderr)
+    return elapsed, packages, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=sorted(UNEXPECTED), default="gradio")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="slowest packages to list")
+    parser.add_argument("--max-seconds", type=float, help="fail if the median wall time is over this")
+    parser.add_argument("app_args", nargs=argparse.REMAINDER, help="extra sidekick flags")
+    args = parser.parse_args()
+
+    # The first run fills the profile cache so the timed runs measure a warm replica
+    run_once(args.mode, args.app_args)
+    runs = [run_once(args.mode, args.app_args) for _ in range(args.runs)]
+    walls = [elapsed for elapsed, _, _ in runs]
+    median = statistics.median(walls)
+    _, packages, modules = runs[-1]
+
+    print(f"mode {args.mode}: median {median:.3f}s, min {min(walls):.3f}s, max {max(walls):.3f}s over {args.runs} runs")
+    print(f"imports: {sum(packages.values()) / 1e6:.3f}s in {len(modules)} modules; slowest packages:")
+    for package, micros in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {micros / 1e6:8.3f}s  {package}")
+    unexpected = [module for module in UNEXPECTED[args.mode] if module in modules]
+    if unexpected:
+        print(f"unexpected imports: {', '.join(unexpected)}")
+    if unexpected or (args.max_seconds is not None and median > args.max_seconds):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
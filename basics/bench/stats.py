@@ -0,0 +1,7 @@
+def percentile(values, pct, digits=None):
+    """The pct-th percentile of values by nearest rank, rounded to digits if given. None when there are none."""
+    values = sorted(values)
+    if not values:
+        return None
+    value = values[min(len(values) - 1, int(len(values) * pct / 100))]
+    return round(value, digits) if digits is not None else value
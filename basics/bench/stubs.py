@@ -0,0 +1,144 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class StubServer:
+    """A local HTTP server running in a background thread for benchmarks."""
+
+    def __init__(self, handler_class, host="127.0.0.1", port=0):
+        self.httpd = ThreadingHTTPServer((host, port), handler_class)
+        self.httpd.daemon_threads = True
+        self.httpd.stub = self
+        self.requests = []
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def pushover_stub(latency=0.2):
+    """A Pushover-compatible endpoint that records each message after `latency` seconds."""
+
+    class Handler(_StubHandler):
+        def do_POST(self):
+            form = parse_qs(self._body().decode())
+            time.sleep(latency)
+            self.server.stub.requests.append((time.perf_counter(), form.get("message", [""])[0]))
+            self._send_json({"status": 1})
+
+    return StubServer(Handler)
+
+
+def openai_stub(latency=0.1, slow_fraction=0.0, slow_latency=2.0, token_delay=0.0, reply="Thanks for asking! " * 5,
+                tool_calls=False, seed=None):
+    """An OpenAI-compatible /chat/completions endpoint with injected latency.
+
+    A slow_fraction of requests wait slow_latency instead of latency before responding.
+    Streaming responses send one word per chunk, token_delay apart. With tool_calls, the
+    first response of each turn asks for record_unknown_question.
+    """
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    class Handler(_StubHandler):
+        def do_POST(self):
+            request = json.loads(self._body() or b"{}")
+            with lock:
+                delay = slow_latency if rng.random() < slow_fraction else latency
+            time.sleep(delay)
+            self.server.stub.requests.append((time.perf_counter(), request.get("model")))
+            messages = request.get("messages", [])
+            call_tool = tool_calls and request.get("tools") and request.get("tool_choice") != "none" \
+                and messages and messages[-1].get("role") == "user"
+            if request.get("stream"):
+                self._stream(call_tool)
+            else:
+                self._complete(call_tool)
+
+        def _tool_call(self):
+            return {"id": f"call_{time.monotonic_ns()}", "type": "function",
+                    "function": {"name": "record_unknown_question", "arguments": json.dumps({"question": "stub"})}}
+
+        def _complete(self, call_tool):
+            message = {"role": "assistant", "content": None if call_tool else reply}
+            if call_tool:
+                message["tool_calls"] = [self._tool_call()]
+            self._send_json({
+                "id": "stub", "object": "chat.completion", "created": int(time.time()), "model": "stub",
+                "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if call_tool else "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            })
+
+        def _chunk(self, delta, finish_reason=None):
+            payload = {"id": "stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": "stub",
+                       "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            data = f"data: {json.dumps(payload)}\n\n".encode()
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        def _stream(self, call_tool):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                if call_tool:
+                    self._chunk({"role": "assistant", "tool_calls": [{"index": 0, **self._tool_call()}]}, "tool_calls")
+                else:
+                    for word in reply.split(" "):
+                        self._chunk({"role": "assistant", "content": word + " "})
+                        if token_delay:
+                            time.sleep(token_delay)
+                    self._chunk({}, "stop")
+                done = b"data: [DONE]\n\n"
+                self.wfile.write(f"{len(done):x}\r\n".encode() + done + b"\r\n0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # The client hung up, e.g. a cancelled hedge
+                pass
+
+    return StubServer(Handler)
+
+
+def geo_stub(latency=0.05):
+    """An ip-api.com compatible endpoint answering /json/<ip> after `latency` seconds."""
+
+    class Handler(_StubHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            self.server.stub.requests.append((time.perf_counter(), self.path))
+            self._send_json({"status": "success", "city": "Kochi", "regionName": "Kerala", "country": "India"})
+
+    return StubServer(Handler)
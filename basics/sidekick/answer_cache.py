@@ -0,0 +1,94 @@
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+
+from sidekick.lru import LRUCache
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize(message):
+    return " ".join(_PUNCTUATION.sub(" ", message.lower()).split())
+
+
+class AnswerCache:
+    """LRU cache of final answers keyed on the normalized message and the system prompt.
+
+    Only conversations with at most max_history prior messages are served from the cache,
+    and callers must not store answers from turns that ran tools. With a path, entries are
+    written to disk and loaded again on startup.
+    """
+
+    def __init__(self, max_entries=512, max_history=0, path=None, ttl=None, save_every=10):
+        self.max_history = max_history
+        self.path = path
+        self.save_every = save_every
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0
+        self._entries = LRUCache(max_entries=max_entries, ttl=ttl)
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        if path:
+            self._load()
+            atexit.register(self.save)
+
+    def key(self, message, system_prompt, history):
+        """The cache key for this turn, or None when the conversation is too long to cache."""
+        if len(history) > self.max_history:
+            return None
+        prompt_hash = hashlib.sha256(system_prompt.encode()).hexdigest()
+        return hashlib.sha256(f"{prompt_hash}\0{normalize(message)}".encode()).hexdigest()
+
+    def get(self, key):
+        if not key:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.latency_saved += entry["latency"]
+        return entry["answer"]
+
+    def put(self, key, answer, latency):
+        if not key or not answer:
+            return
+        self._entries.set(key, {"answer": answer, "latency": latency})
+        self._unsaved += 1
+        if self.path and self._unsaved >= self.save_every:
+            self.save()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+        }
+
+    def save(self):
+        with self._lock:
+            self._unsaved = 0
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(dict(self._entries.items()), f)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                print(f"Could not save answer cache: {e}", flush=True)
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, entry in entries.items():
+            self._entries.set(key, entry)
@@ -0,0 +1,92 @@
+"""Serve the career chat app.
+
+    python -m sidekick                                  # Gradio, notifications through Pushover
+    python -m sidekick --mode fastapi --workers 4       # FastAPI with geo-IP logging and /metrics
+    python -m sidekick --mode fastapi --personas people --no-geo
+
+Only what the chosen mode needs is imported: FastAPI, uvicorn, httpx and the serving code
+load in fastapi mode only, requests only when notifications are on, and pypdf only when the
+profile cache is cold.
+"""
+import argparse
+import os
+
+MODES = ("gradio", "fastapi")
+
+
+def build_parser():
+    from sidekick.notify import NOTIFY_BACKENDS
+
+    parser = argparse.ArgumentParser(prog="python -m sidekick", description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=MODES, default="gradio",
+                        help="gradio launches the chat UI alone; fastapi mounts it in FastAPI with middleware")
+    parser.add_argument("--notify", choices=NOTIFY_BACKENDS, default="pushover", help="where notifications go")
+    parser.add_argument("--host", help="default: Gradio's own default in gradio mode, localhost in fastapi mode")
+    parser.add_argument("--port", type=int, help="default: GRADIO_SERVER_PORT or 7860")
+    parser.add_argument("--concurrency", type=int, default=16, help="chats each process runs at once")
+    parser.add_argument("--max-queue", type=int, default=64, help="chats each process queues before answering busy")
+    fastapi = parser.add_argument_group("fastapi mode")
+    fastapi.add_argument("--workers", type=int, default=1, help="worker processes forked after the profile is loaded")
+    fastapi.add_argument("--geo", action=argparse.BooleanOptionalAction, default=True,
+                         help="look up and notify visitor locations")
+    fastapi.add_argument("--metrics", action=argparse.BooleanOptionalAction, default=True,
+                         help="serve Prometheus metrics at /metrics")
+    fastapi.add_argument("--personas", default=os.getenv("PERSONAS_DIR"),
+                         help="folder of persona folders, each with summary.txt and a profile PDF")
+    fastapi.add_argument("--max-personas", type=int, default=32, help="personas each worker keeps loaded")
+    fastapi.add_argument("--max-persona-mb", type=int, default=256, help="memory each worker spends on loaded personas")
+    parser.add_argument("--trace", action=argparse.BooleanOptionalAction,
+                        default=os.getenv("SIDEKICK_TRACE", "") not in ("", "0", "off"),
+                        help="print each request's stages with their trace ID and seconds (default: SIDEKICK_TRACE)")
+    parser.add_argument("--dry-run", action="store_true", help="load the profile and build the app, then exit")
+    return parser
+
+
+def main(argv=None):
+    # Module-level settings such as GEMINI_BASE_URL read the environment on import
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.mode == "gradio" and (args.workers > 1 or args.personas):
+        parser.error("--workers and --personas need --mode fastapi")
+
+    from sidekick.me import Me
+    from sidekick.metrics import enable_tracing
+    from sidekick.notify import notifier_from_env
+
+    if args.trace:
+        # Before forking, so every worker inherits the handler
+        enable_tracing()
+
+    notifier = notifier_from_env(args.notify)
+    me = Me(push=notifier.send if notifier else None)
+    if args.mode == "fastapi":
+        # Load the index once, before forking, so workers share it
+        me.profile.index()
+
+    if args.mode == "gradio":
+        import gradio as gr
+
+        demo = gr.ChatInterface(me.chat_stream, type="messages", concurrency_limit=args.concurrency)
+        demo.queue(max_size=args.max_queue)
+        if not args.dry_run:
+            demo.launch(server_name=args.host, server_port=args.port)
+        return
+
+    from sidekick.me import load_personas
+    from sidekick.serving import serve
+    from sidekick.web import create_app
+
+    # Other personas load in each worker on first use
+    def app_factory():
+        personas = load_personas(me, args.personas, args.max_personas, args.max_persona_mb) if args.personas else None
+        return create_app(me, args.concurrency, args.max_queue, personas, geo=args.geo, metrics=args.metrics,
+                          notifier=notifier)
+
+    if args.dry_run:
+        app_factory()
+        return
+    port = args.port or int(os.getenv("GRADIO_SERVER_PORT", 7860))
+    serve(app_factory, host=args.host or "localhost", port=port, workers=args.workers)
@@ -0,0 +1,63 @@
+import hashlib
+
+from sidekick.lru import LRUCache
+from sidekick.retrieval import estimate_tokens
+
+
+def message_tokens(message):
+    content = message.get("content")
+    # A few tokens of per-message overhead for the role and separators
+    return 4 + (estimate_tokens(content) if isinstance(content, str) else 0)
+
+
+def _prefix_hashes(history):
+    hashes, digest = [b""], b""
+    for message in history:
+        digest = hashlib.sha256(digest + f"{message.get('role')}\0{message.get('content')}".encode()).digest()
+        hashes.append(digest)
+    return hashes
+
+
+class ContextWindow:
+    """Keeps a conversation's recent messages within a token budget.
+
+    Older messages are folded into a rolling summary. Summaries are cached by a hash of
+    the folded prefix, so a later turn only summarizes the messages folded since the last
+    summary. summarize(previous_summary, messages) returns the updated summary text.
+    """
+
+    def __init__(self, summarize, budget=2000, max_summaries=1024):
+        self.summarize = summarize
+        self.budget = budget
+        self.summaries = LRUCache(max_entries=max_summaries)
+
+    def fit(self, history):
+        """Return (summary, recent_messages). The summary is None while the history fits."""
+        tokens = [message_tokens(message) for message in history]
+        if sum(tokens) <= self.budget:
+            return None, history
+        suffix = [0] * (len(history) + 1)
+        for i in range(len(history) - 1, -1, -1):
+            suffix[i] = suffix[i + 1] + tokens[i]
+        hashes = _prefix_hashes(history)
+
+        # Keep using the latest fold while what follows it still fits
+        previous_cut, previous_summary = 0, ""
+        for cut in range(len(history), 0, -1):
+            summary = self.summaries.get(hashes[cut])
+            if summary is not None:
+                previous_cut, previous_summary = cut, summary
+                break
+        if previous_cut and suffix[previous_cut] <= self.budget:
+            return previous_summary, history[previous_cut:]
+
+        # Otherwise fold down to half the budget, so the next fold is several turns away.
+        # Cut on a user message so the window never opens with an orphaned reply.
+        cut = next(
+            (i for i in range(previous_cut, len(history))
+             if suffix[i] <= self.budget // 2 and history[i].get("role") == "user"),
+            len(history)
+        )
+        summary = self.summarize(previous_summary, history[previous_cut:cut])
+        self.summaries.set(hashes[cut], summary)
+        return summary, history[cut:]
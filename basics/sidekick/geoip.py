@@ -0,0 +1,93 @@
+import asyncio
+import os
+
+from sidekick.lru import LRUCache
+from sidekick.metrics import span
+
+IP_API_URL = os.getenv("IP_API_URL", "http://ip-api.com/json/{ip}")
+
+# Gradio loads dozens of assets, heartbeats and queue polls per page view. Only the
+# page itself and a submitted chat message are worth a lookup.
+ENRICH_ROUTES = (
+    ("GET", "/"),
+    ("POST", "/gradio_api/queue/join"),
+)
+
+
+def client_ip(request):
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class GeoEnricher:
+    """Looks up client IP locations in the background, with an LRU+TTL cache per IP.
+
+    on_result(ip, geo_data) is called once the location is known; request handling never waits on it.
+    """
+
+    def __init__(self, on_result, url=IP_API_URL, routes=ENRICH_ROUTES, max_entries=4096, ttl=3600, timeout=2.0):
+        self.on_result = on_result
+        self.url = url
+        self.routes = routes
+        self.timeout = timeout
+        self.cache = LRUCache(max_entries=max_entries, ttl=ttl)
+        self.lookups = 0
+        self._client = None
+        self._inflight = {}
+        self._tasks = set()
+
+    def should_enrich(self, request):
+        return (request.method, request.url.path) in self.routes
+
+    def schedule(self, ip):
+        task = asyncio.get_running_loop().create_task(self._enrich(ip))
+        # Keep a reference so the task isn't garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def lookup(self, ip):
+        geo_data = self.cache.get(ip)
+        if geo_data is not None:
+            return geo_data
+        # Concurrent requests from the same visitor share one outbound call
+        pending = self._inflight.get(ip)
+        if pending is None:
+            pending = asyncio.ensure_future(self._fetch(ip))
+            self._inflight[ip] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(ip, None))
+        return await asyncio.shield(pending)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def _fetch(self, ip):
+        import httpx
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        self.lookups += 1
+        try:
+            with span("geo_lookup"):
+                response = await self._client.get(self.url.format(ip=ip))
+                geo_data = response.json()
+            if not isinstance(geo_data, dict):
+                raise ValueError(f"Unexpected geo-IP response {geo_data!r}")
+        except (httpx.HTTPError, httpx.InvalidURL, ValueError) as e:
+            # An unknown location rather than an error; cached briefly so an unreachable
+            # service isn't hammered
+            print(f"Geo-IP lookup for {ip} failed: {e!r}", flush=True)
+            self.cache.set(ip, {}, ttl=60)
+            return {}
+        self.cache.set(ip, geo_data)
+        return geo_data
+
+    async def _enrich(self, ip):
+        try:
+            geo_data = await self.lookup(ip)
+            self.on_result(ip, geo_data)
+        except Exception as e:
+            # Runs as a background task, where nothing else would see the error
+            print(f"Geo-IP enrichment for {ip} failed: {e!r}", flush=True)
@@ -0,0 +1,123 @@
+import asyncio
+import random
+import time
+from collections import deque
+
+import openai
+
+from sidekick.metrics import LLM_EVENTS, span
+
+TRANSIENT_ERRORS = (
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class LLMExecutor:
+    """Runs chat completion requests under a per-turn deadline, with hedging and jittered retries.
+
+    Once hedge_min_samples latencies have been seen, a request still outstanding after the
+    hedge_percentile latency gets a duplicate; whichever succeeds first wins and the other is
+    cancelled. Create the client with max_retries=0 so retries aren't applied twice.
+    """
+
+    def __init__(self, client, deadline=30.0, max_tool_rounds=3, hedge_percentile=95, hedge_min_samples=20,
+                 max_retries=2, backoff_base=0.25, backoff_cap=2.0, window=500):
+        self.client = client
+        self.deadline = deadline
+        self.max_tool_rounds = max_tool_rounds
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.latencies = deque(maxlen=window)
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.retries = 0
+
+    def start_turn(self):
+        """The monotonic deadline for a turn starting now."""
+        return time.monotonic() + self.deadline
+
+    def hedge_delay(self):
+        if not self.hedge_percentile or len(self.latencies) < self.hedge_min_samples:
+            return None
+        return _percentile(self.latencies, self.hedge_percentile)
+
+    async def create(self, deadline, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded("LLM turn deadline exceeded")
+            try:
+                async with asyncio.timeout(remaining):
+                    return await self._hedged(kwargs)
+            except TimeoutError:
+                raise DeadlineExceeded("LLM turn deadline exceeded") from None
+            except TRANSIENT_ERRORS:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                LLM_EVENTS.inc(event="retry")
+                # Full jitter keeps retries from replicas from arriving in lockstep
+                backoff = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                await asyncio.sleep(min(backoff, max(0.0, deadline - time.monotonic())))
+
+    async def _timed(self, kwargs):
+        start = time.monotonic()
+        with span("llm_request"):
+            result = await self.client.chat.completions.create(**kwargs)
+        self.latencies.append(time.monotonic() - start)
+        return result
+
+    async def _hedged(self, kwargs):
+        primary = asyncio.create_task(self._timed(kwargs))
+        tasks = {primary}
+        try:
+            delay = self.hedge_delay()
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+
+            self.hedges += 1
+            LLM_EVENTS.inc(event="hedge")
+            hedge = asyncio.create_task(self._timed(kwargs))
+            tasks.add(hedge)
+            pending, error = tasks, None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                            LLM_EVENTS.inc(event="hedge_won")
+                        for other in done - {task}:
+                            await _discard(other)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # Cancel the loser, or both when the turn deadline cuts the wait short
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+
+async def _discard(task):
+    # Both requests may finish together; close the losing stream so its connection is released
+    if task.exception() is None and hasattr(task.result(), "close"):
+        result = task.result().close()
+        if asyncio.iscoroutine(result):
+            await result
@@ -0,0 +1,215 @@
+import asyncio
+import os
+import time
+
+import gradio as gr
+from openai import AsyncOpenAI, OpenAI
+
+from sidekick.answer_cache import AnswerCache
+from sidekick.context_window import ContextWindow
+from sidekick.geoip import client_ip
+from sidekick.llm_executor import DeadlineExceeded, LLMExecutor
+from sidekick.metrics import new_trace, span
+from sidekick.personas import PersonaRegistry, persona_slug
+from sidekick.profile import ProfileContext
+from sidekick.retrieval import retrieval_query
+from sidekick.streaming import stream_chat
+from sidekick.tools import make_registry, tools
+
+# Profile paths are resolved from the package, not the working directory
+ME_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "me")
+
+DEADLINE_REPLY = "Sorry, that's taking longer than it should. Please try asking again."
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta/")
+
+
+class Me:
+    def __init__(self, name="Vimal Pillai", pdf_path=os.path.join(ME_DIR, "Vimal-Profile.pdf"),
+                 summary_path=os.path.join(ME_DIR, "summary.txt"), top_k=6, context_tokens=1200, history_tokens=2000,
+                 push=None, shared=None):
+        if shared is None:
+            self.push = push or (lambda text: None)
+            self.registry = make_registry(self.push)
+            self.gemini_client = OpenAI(
+                base_url=GEMINI_BASE_URL,
+                api_key=os.getenv("GEMINI_API_KEY")
+            )
+            # Retries are left to the executor, which also hedges and enforces the turn deadline
+            self.gemini_async_client = AsyncOpenAI(
+                base_url=GEMINI_BASE_URL,
+                api_key=os.getenv("GEMINI_API_KEY"),
+                max_retries=0
+            )
+            self.executor = LLMExecutor(self.gemini_async_client)
+            self.answer_cache = AnswerCache(path=os.getenv("ANSWER_CACHE_PATH"))
+        else:
+            # Hosted personas share clients, the executor's latency window and the answer cache,
+            # whose keys include the system prompt and so never cross personas
+            self.push = shared.push
+            self.registry = shared.registry
+            self.gemini_client = shared.gemini_client
+            self.gemini_async_client = shared.gemini_async_client
+            self.executor = shared.executor
+            self.answer_cache = shared.answer_cache
+        self.name = name
+        self.profile = ProfileContext(pdf_path, summary_path)
+        self._system_prompt = None
+        self.top_k = top_k
+        self.context_tokens = context_tokens
+        self.window = ContextWindow(self.summarize_history, budget=history_tokens)
+    
+    def handle_tool_calls(self, tool_calls):
+        return self.registry.run(tool_calls)
+
+    def summarize_history(self, summary, messages):
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages if isinstance(m.get("content"), str))
+        response = self.gemini_client.chat.completions.create(model="gemini-2.0-flash", messages=[
+            {"role": "system", "content": f"You keep a running summary of a conversation between a website visitor and {self.name}. "
+                                          "Update the summary with the new messages. Keep any names, email addresses, questions and answers. "
+                                          "Reply with the updated summary only, in under 200 words."},
+            {"role": "user", "content": f"Summary so far:\n{summary or 'None'}\n\nNew messages:\n{transcript}"}
+        ])
+        return response.choices[0].message.content
+    
+    def system_prompt(self, query=None):
+        if self.profile.refresh() or self._system_prompt is None:
+            self._system_prompt = self._render_system_prompt(self.profile.summary, self.profile.linkedin)
+        if query is None or not self.top_k:
+            return self._system_prompt
+        return self._render_system_prompt(*self.profile_excerpts(query))
+
+    def profile_excerpts(self, query):
+        index = self.profile.index()
+        selected = index.search(query, self.top_k, self.context_tokens)
+        summary = "\n".join(index.chunks[i] for i in selected if index.sources[i] == "summary")
+        linkedin = "\n".join(index.chunks[i] for i in selected if index.sources[i] == "linkedin")
+        return summary, linkedin
+
+    def _render_system_prompt(self, summary, linkedin):
+        system_prompt = f"""You are acting as {self.name}, answering questions on {self.name}’s website.
+                        You must respond only with information explicitly stated in the provided Summary and LinkedIn Profile.
+
+                        Absolute Rules:
+                        No outside knowledge: Do not use or reference any information beyond the provided context — not even well-known facts, common-sense reasoning, or typical industry practices.
+                        No guessing or assumptions: If something is not explicitly stated in the provided context, you must state that the information is not available.
+                        No paraphrasing that adds meaning: You may rephrase for clarity, but the meaning must remain exactly as in the original text.
+                        ## No filling gaps: If the question asks for details that are not in the provided context, politely say the information is not provided and record the question using the record_unknown_question tool.
+                        Stay in character: Always speak as {self.name}. Maintain a professional, engaging, and approachable tone, as if speaking to a potential client or employer.
+                        ## Encourage contact: If the user shows interest in {self.name}’s work, steer them toward providing their email address and record it using the record_user_details tool.
+                        ## Summary:
+                        {summary}
+
+                        ## LinkedIn Profile:
+                        {linkedin}
+                        """
+
+        system_prompt += f"With this context, please chat with the user, always staying in character as {self.name}."
+        return system_prompt
+    
+    def chat(self, message, history, request: gr.Request = None):
+        self.push(f"prompt - || {message} ||, IP - {client_ip(request) if request else 'unknown'}")
+        system_prompt = self.system_prompt(retrieval_query(message, history))
+        key = self.answer_cache.key(message, system_prompt, history)
+        cached = self.answer_cache.get(key)
+        if cached is not None:
+            return cached
+        start = time.perf_counter()
+        summary, history = self.window.fit(history)
+        if summary:
+            system_prompt += f"\n## Earlier in this conversation:\n{summary}"
+        messages = [{"role": "system", "content": system_prompt}] + history + [{"role": "user", "content": message}]
+        turn_length = len(messages)
+        deadline = self.executor.start_turn()
+        tool_rounds = 0
+        done = False
+        while not done:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return DEADLINE_REPLY
+            tool_choice = "auto" if tool_rounds < self.executor.max_tool_rounds else "none"
+            response = self.gemini_client.chat.completions.create(model="gemini-2.0-flash", messages=messages, tools=tools,
+                                                                  tool_choice=tool_choice, timeout=remaining)
+            finish_reason = response.choices[0].finish_reason
+            if finish_reason == "tool_calls":
+                message = response.choices[0].message
+                tool_calls = message.tool_calls
+                results = self.handle_tool_calls(tool_calls)
+                messages.append(message)
+                messages.extend(results)
+                tool_rounds += 1
+            else:
+                done = True
+        reply = response.choices[0].message.content
+        # Turns that ran tools had side effects, so they are never served from the cache
+        if len(messages) == turn_length:
+            self.answer_cache.put(key, reply, time.perf_counter() - start)
+        return reply
+
+    async def chat_stream(self, message, history, request: gr.Request = None):
+        self.push(f"prompt - || {message} ||, IP - {client_ip(request) if request else 'unknown'}")
+        new_trace(request.headers.get("x-request-id") if request else None)
+        with span("chat_turn"):
+            async for reply in self._chat_stream(message, history):
+                yield reply
+
+    async def _chat_stream(self, message, history):
+        # Refreshing the profile can stat, hash and parse files and build the BM25 index; keep it off the loop
+        system_prompt = await asyncio.to_thread(self.system_prompt, retrieval_query(message, history))
+        key = self.answer_cache.key(message, system_prompt, history)
+        cached = self.answer_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        start = time.perf_counter()
+        summary, history = await asyncio.to_thread(self.window.fit, history)
+        if summary:
+            system_prompt += f"\n## Earlier in this conversation:\n{summary}"
+        messages = [{"role": "system", "content": system_prompt}] + history + [{"role": "user", "content": message}]
+        turn_length = len(messages)
+        reply = ""
+        try:
+            async for reply in stream_chat(self.executor, "gemini-2.0-flash", messages, tools, self.handle_tool_calls):
+                yield reply
+        except DeadlineExceeded:
+            yield f"{reply}\n\n{DEADLINE_REPLY}" if reply else DEADLINE_REPLY
+            return
+        if len(messages) == turn_length:
+            self.answer_cache.put(key, reply, time.perf_counter() - start)
+
+
+def load_personas(me, root, max_active=32, max_mb=256):
+    """A registry of the persona folders under root that share me's clients and caches."""
+
+    def load(slug, name, pdf_path, summary_path):
+        persona = Me(name, pdf_path, summary_path, shared=me)
+        if persona.top_k:
+            # PersonaRegistry.get loads in a worker thread: build the index there, not on the
+            # loop at the first chat, and before the registry measures the persona's size
+            persona.profile.index()
+        return persona
+
+    return PersonaRegistry(
+        root,
+        load,
+        sizeof=lambda persona: persona.profile.footprint(),
+        max_active=max_active,
+        max_bytes=max_mb * 2 ** 20,
+    )
+
+
+def routed_chat(me, personas):
+    """A chat function sending each chat to the persona it asks for, or to me."""
+
+    async def chat_stream(message, history, request: gr.Request):
+        # Chats for an unknown or missing persona go to the default one
+        persona = me
+        slug = persona_slug(request)
+        if personas is not None and slug:
+            try:
+                persona = await asyncio.to_thread(personas.get, slug)
+            except KeyError:
+                pass
+        async for reply in persona.chat_stream(message, history, request):
+            yield reply
+
+    return chat_stream
@@ -0,0 +1,195 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+
+from sidekick.metrics import new_trace, span, trace_id
+
+PUSHOVER_URL = os.getenv("PUSHOVER_URL", "https://api.pushover.net/1/messages.json")
+NOTIFY_SPILL_PATH_ENV = "NOTIFY_SPILL_PATH"
+
+
+class Notifier:
+    """Queues push notifications and delivers them in batches from one background thread.
+
+    send() never blocks: when the queue is full, messages are appended to spill_path
+    (and delivered once the queue drains) or dropped if no spill file is configured.
+    """
+
+    def __init__(self, url, token, user, max_queue=1000, batch_window=1.0, max_message_chars=1024,
+                 spill_path=None, timeout=5.0):
+        self.url = url
+        self.token = token
+        self.user = user
+        self.batch_window = batch_window
+        self.max_message_chars = max_message_chars
+        self.spill_path = spill_path
+        self.timeout = timeout
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self.spilled = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        if spill_path and os.path.dirname(spill_path):
+            try:
+                os.makedirs(os.path.dirname(spill_path), exist_ok=True)
+            except OSError as e:
+                # _spill drops messages it can't write, so a bad path costs messages, not requests
+                print(f"Notification spill directory unavailable: {e}", flush=True)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def send(self, text):
+        self._ensure_started()
+        try:
+            # The push is logged under the trace IDs of the requests whose messages it carries
+            self._queue.put_nowait((trace_id(), text))
+        except queue.Full:
+            self._spill(text)
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far has been delivered. Returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="notifier", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush, 2.0)
+
+    def _after_fork(self):
+        # The delivery thread doesn't survive a fork; a worker starts its own on first send
+        self._queue = queue.Queue(maxsize=self._queue.maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _spill(self, text):
+        if not self.spill_path:
+            self.dropped += 1
+            return
+        try:
+            with self._lock:
+                with open(self.spill_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(text) + "\n")
+        except OSError:
+            # send() is on the request path and must never raise
+            self.dropped += 1
+            return
+        self.spilled += 1
+
+    def _unspill(self):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return []
+        # Forked workers share the spill file, so each drains it under a name of its own
+        draining = f"{self.spill_path}.{os.getpid()}.draining"
+        try:
+            with self._lock:
+                os.replace(self.spill_path, draining)
+        except FileNotFoundError:
+            # Another worker took it first
+            return []
+        texts = []
+        with open(draining, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    texts.append(str(json.loads(line)))
+                except ValueError:
+                    # A line cut short by a crash mid-write; skip it rather than the whole file
+                    if line.strip():
+                        self.dropped += 1
+        os.remove(draining)
+        return texts
+
+    def _collect(self):
+        try:
+            batch = [self._queue.get(timeout=self.batch_window)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.batch_window
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _pack(self, texts):
+        # Pushover caps a message at 1024 characters, so coalesce up to that size
+        messages, current = [], ""
+        for text in texts:
+            text = text[:self.max_message_chars]
+            if current and len(current) + 1 + len(text) > self.max_message_chars:
+                messages.append(current)
+                current = text
+            else:
+                current = f"{current}\n{text}" if current else text
+        if current:
+            messages.append(current)
+        return messages
+
+    def _run(self):
+        import requests
+
+        session = requests.Session()
+        while True:
+            batch = self._collect()
+            try:
+                self._deliver(session, batch)
+            except Exception as e:
+                # Anything unexpected mustn't end the thread, or the queue fills and everything is dropped
+                print(f"Notification delivery error: {e!r}", flush=True)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _deliver(self, session, batch):
+        import requests
+
+        # Spilled messages are picked up again once the queue has room
+        spilled = self._unspill() if self._queue.empty() else []
+        new_trace(",".join(sorted({trace for trace, _ in batch if trace != "-"})) or None)
+        for message in self._pack([text for _, text in batch] + spilled):
+            try:
+                with span("push"):
+                    response = session.post(
+                        self.url,
+                        data={"token": self.token, "user": self.user, "message": message},
+                        timeout=self.timeout
+                    )
+                    response.raise_for_status()
+                self.sent += 1
+            except requests.RequestException as e:
+                self.failed += 1
+                print(f"Notification failed: {e}", flush=True)
+
+
+NOTIFY_BACKENDS = ("pushover", "proxy", "none")
+
+
+def notifier_from_env(backend):
+    """A Notifier for the named backend, configured from the environment. None for "none".
+
+    pushover posts to PUSHOVER_URL with PUSHOVER_TOKEN and PUSHOVER_USER; proxy posts the
+    same form to URL with TOKEN and USER. With NOTIFY_SPILL_PATH set, messages that don't
+    fit in the queue are kept in that file until there's room, instead of being dropped.
+    """
+    spill_path = os.getenv(NOTIFY_SPILL_PATH_ENV) or None
+    if backend == "pushover":
+        return Notifier(PUSHOVER_URL, os.getenv("PUSHOVER_TOKEN"), os.getenv("PUSHOVER_USER"), spill_path=spill_path)
+    if backend == "proxy":
+        return Notifier(os.getenv("URL"), os.getenv("TOKEN"), os.getenv("USER"), spill_path=spill_path)
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown notification backend {backend}, expected one of {', '.join(NOTIFY_BACKENDS)}")
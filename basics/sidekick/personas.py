@@ -0,0 +1,142 @@
+import glob
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import parse_qs, urlsplit
+
+_SLUG = re.compile(r"[a-z0-9][a-z0-9_-]{0,63}")
+_PATH_SLUG = re.compile(r"/p/([^/?#]+)")
+
+
+def persona_slug(request):
+    """The persona a chat request asks for: the X-Persona header, a persona query parameter
+    or a /p/<slug> path, on the request itself or on the page that sent it. None if absent."""
+    if request is None:
+        return None
+    slug = request.headers.get("x-persona")
+    if slug:
+        return slug
+    urls = [str(getattr(request, "url", "") or ""), request.headers.get("referer", "")]
+    for url in urls:
+        parts = urlsplit(url)
+        slug = parse_qs(parts.query).get("persona", [None])[0]
+        if slug:
+            return slug
+        match = _PATH_SLUG.search(parts.path)
+        if match:
+            return match.group(1)
+    return None
+
+
+class PersonaRegistry:
+    """Personas kept in folders under `root`, loaded on first use and evicted least recently used.
+
+    Each persona folder holds summary.txt, a profile PDF and optionally persona.json with a
+    "name". Nothing is read at construction, so startup doesn't depend on how many folders
+    exist. factory(slug, name, pdf_path, summary_path) builds a persona; sizeof(persona)
+    estimates the bytes it holds. Loaded personas are evicted once there are more than
+    max_active of them or together they exceed max_bytes.
+    """
+
+    def __init__(self, root, factory, sizeof=None, max_active=32, max_bytes=256 * 2 ** 20):
+        self.root = root
+        self.factory = factory
+        self.sizeof = sizeof or (lambda persona: 0)
+        self.max_active = max_active
+        self.max_bytes = max_bytes
+        self.loads = 0
+        self.evictions = 0
+        self._active = OrderedDict()
+        self._sizes = {}
+        self._loading = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._active)
+
+    def __contains__(self, slug):
+        return self.paths(slug) is not None
+
+    def slugs(self):
+        """Every persona folder under root. Scans the directory, so keep it off the request path."""
+        try:
+            entries = sorted(os.listdir(self.root))
+        except OSError:
+            return []
+        return [slug for slug in entries if slug in self]
+
+    def paths(self, slug):
+        """(name, pdf_path, summary_path) for a persona folder, or None if it isn't one."""
+        if not slug or not _SLUG.fullmatch(slug):
+            return None
+        folder = os.path.join(self.root, slug)
+        summary_path = os.path.join(folder, "summary.txt")
+        pdfs = sorted(glob.glob(os.path.join(glob.escape(folder), "*.pdf")))
+        if not pdfs or not os.path.isfile(summary_path):
+            return None
+        name = slug.replace("-", " ").replace("_", " ").title()
+        try:
+            with open(os.path.join(folder, "persona.json"), "r", encoding="utf-8") as f:
+                name = json.load(f).get("name", name)
+        except (OSError, ValueError, AttributeError):
+            pass
+        return name, pdfs[0], summary_path
+
+    def get(self, slug):
+        """The loaded persona for slug, loading it if needed. Raises KeyError for unknown slugs.
+
+        Loading reads and parses files, so call it from a worker thread in async code.
+        """
+        with self._lock:
+            persona = self._active.get(slug)
+            if persona is not None:
+                self._active.move_to_end(slug)
+            else:
+                # One thread loads a persona while others asking for it wait
+                loading = self._loading.setdefault(slug, threading.Lock())
+        if persona is None:
+            try:
+                with loading:
+                    with self._lock:
+                        persona = self._active.get(slug)
+                    if persona is None:
+                        persona = self._load(slug)
+            finally:
+                with self._lock:
+                    self._loading.pop(slug, None)
+        with self._lock:
+            # Indexes load lazily after a persona is created, so sizes are re-measured on every get.
+            # Another thread may have evicted it since; a size kept for it would count forever
+            if slug in self._active:
+                self._sizes[slug] = self.sizeof(persona)
+                self._evict(keep=slug)
+        return persona
+
+    def stats(self):
+        with self._lock:
+            return {
+                "active": len(self._active),
+                "active_bytes": sum(self._sizes.values()),
+                "loads": self.loads,
+                "evictions": self.evictions,
+            }
+
+    def _load(self, slug):
+        paths = self.paths(slug)
+        if paths is None:
+            raise KeyError(slug)
+        persona = self.factory(slug, *paths)
+        with self._lock:
+            self._active[slug] = persona
+            self.loads += 1
+        return persona
+
+    def _evict(self, keep):
+        while len(self._active) > 1 and (len(self._active) > self.max_active or
+                                          sum(self._sizes.values()) > self.max_bytes):
+            slug = next(s for s in self._active if s != keep)
+            del self._active[slug]
+            self._sizes.pop(slug, None)
+            self.evictions += 1
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import threading
+
+
+def _digest(paths):
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def _stamp(paths):
+    stats = [os.stat(path) for path in paths]
+    return tuple((st.st_mtime_ns, st.st_size) for st in stats)
+
+
+def _extract_pdf(path):
+    # pypdf is only needed on a cache miss, so keep it off the startup path
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return "".join(text for text in (page.extract_text() for page in reader.pages) if text)
+
+
+class ProfileContext:
+    """Profile text parsed from the PDF and summary, cached on disk by content hash.
+
+    Safe to use from several threads: chats refresh it and build its index in worker threads.
+    """
+
+    def __init__(self, pdf_path, summary_path, cache_dir=None):
+        self.pdf_path = pdf_path
+        self.summary_path = summary_path
+        self.cache_dir = cache_dir or os.path.join(os.path.dirname(pdf_path), ".cache")
+        self.linkedin = ""
+        self.summary = ""
+        self.digest = None
+        self._stamp = None
+        self._index = None
+        self._lock = threading.RLock()
+        self.refresh()
+
+    @property
+    def sources(self):
+        return (self.pdf_path, self.summary_path)
+
+    def refresh(self):
+        """Reload the context if a source file changed. Returns True when it did."""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self):
+        stamp = _stamp(self.sources)
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        digest = _digest(self.sources)
+        if digest == self.digest:
+            return False
+        data = self._load(digest)
+        if data is None:
+            data = self._build()
+            self._store(digest, data)
+        self.linkedin = data["linkedin"]
+        self.summary = data["summary"]
+        self.digest = digest
+        self._index = None
+        return True
+
+    def footprint(self):
+        """Approximate bytes held in memory by the parsed text and, once loaded, the index."""
+        size = len(self.linkedin) + len(self.summary)
+        if self._index is not None:
+            # Vocabulary entries are a short string key plus an int, roughly 100 bytes each
+            size += self._index.weights.nbytes + sum(map(len, self._index.chunks)) + 100 * len(self._index.vocabulary)
+        return size
+
+    def index(self):
+        """The BM25 index over the profile chunks, loaded from the cache or built on first use."""
+        with self._lock:
+            return self._load_index()
+
+    def _load_index(self):
+        if self._index is None:
+            from sidekick.retrieval import BM25Index, chunk_text
+
+            path = os.path.join(self.cache_dir, f"index-{self.digest[:16]}.npz")
+            try:
+                self._index = BM25Index.load(path)
+            except (OSError, ValueError, KeyError):
+                summary, linkedin = chunk_text(self.summary), chunk_text(self.linkedin)
+                self._index = BM25Index.build(summary + linkedin, ["summary"] * len(summary) + ["linkedin"] * len(linkedin))
+                tmp = f"{path}.{os.getpid()}.tmp"
+                try:
+                    os.makedirs(self.cache_dir, exist_ok=True)
+                    self._index.save(tmp)
+                    os.replace(tmp, path)
+                except OSError:
+                    pass
+        return self._index
+
+    def _cache_path(self, digest):
+        return os.path.join(self.cache_dir, f"profile-{digest[:16]}.json")
+
+    def _load(self, digest):
+        try:
+            with open(self._cache_path(digest), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if data.get("digest") == digest else None
+
+    def _build(self):
+        with open(self.summary_path, "r", encoding="utf-8") as f:
+            summary = f.read()
+        return {"linkedin": _extract_pdf(self.pdf_path), "summary": summary}
+
+    def _store(self, digest, data):
+        path = self._cache_path(digest)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"digest": digest, **data}, f)
+            # Several workers may race to fill the cache; replace is atomic
+            os.replace(tmp, path)
+        except OSError:
+            pass
@@ -0,0 +1,108 @@
+import re
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+_STOP_WORDS = frozenset(
+    "a an and are as at be by can did do does for from had has have how i in is it me my of on or "
+    "so that the their them there they this to was we were what when where which who why will with "
+    "you your".split()
+)
+
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English text; close enough for budgeting
+    return max(1, len(text) // 4)
+
+
+def tokenize(text):
+    return [word for word in _WORD.findall(text.lower()) if word not in _STOP_WORDS]
+
+
+def chunk_text(text, max_tokens=80):
+    """Split text on line boundaries into chunks of at most about max_tokens tokens."""
+    chunks, current = [], []
+    size = 0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        tokens = estimate_tokens(line)
+        if current and size + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(line)
+        size += tokens
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+class BM25Index:
+    """Okapi BM25 over a small set of chunks, held as a dense chunk-by-term weight matrix."""
+
+    def __init__(self, chunks, sources, vocabulary, weights):
+        self.chunks = list(chunks)
+        self.sources = list(sources)
+        self.vocabulary = vocabulary
+        self.weights = weights
+
+    @classmethod
+    def build(cls, chunks, sources, k1=1.5, b=0.75):
+        docs = [tokenize(chunk) for chunk in chunks]
+        vocabulary = {}
+        for doc in docs:
+            for term in doc:
+                vocabulary.setdefault(term, len(vocabulary))
+        tf = np.zeros((len(docs), max(1, len(vocabulary))), dtype=np.float32)
+        for row, doc in enumerate(docs):
+            for term in doc:
+                tf[row, vocabulary[term]] += 1
+        lengths = tf.sum(axis=1, keepdims=True)
+        avg_length = max(float(lengths.mean()), 1.0) if len(docs) else 1.0
+        df = (tf > 0).sum(axis=0)
+        idf = np.log1p((len(docs) - df + 0.5) / (df + 0.5)).astype(np.float32)
+        # Everything except the query terms is fixed, so fold it into one weight per (chunk, term)
+        weights = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * lengths / avg_length))
+        return cls(chunks, sources, vocabulary, weights.astype(np.float32))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            terms = data["terms"].tolist()
+            return cls(data["chunks"].tolist(), data["sources"].tolist(),
+                       {term: i for i, term in enumerate(terms)}, data["weights"])
+
+    def save(self, path):
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        with open(path, "wb") as f:
+            np.savez(f, chunks=np.array(self.chunks, dtype=str), sources=np.array(self.sources, dtype=str),
+                     terms=np.array(terms, dtype=str), weights=self.weights)
+
+    def scores(self, query):
+        columns = [self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary]
+        if not columns:
+            return np.zeros(len(self.chunks), dtype=np.float32)
+        return self.weights[:, columns].sum(axis=1)
+
+    def search(self, query, top_k=6, token_budget=1200):
+        """Return the indices of the best matching chunks that fit the budget, in document order.
+
+        When nothing matches (greetings, small talk) the leading chunks are used instead.
+        """
+        scores = self.scores(query)
+        order = np.argsort(-scores, kind="stable")
+        selected, used = [], 0
+        for i in order[:top_k]:
+            tokens = estimate_tokens(self.chunks[i])
+            if used + tokens > token_budget:
+                continue
+            selected.append(int(i))
+            used += tokens
+        return sorted(selected)
+
+
+def retrieval_query(message, history):
+    """The text to retrieve on: the new message plus the previous user turn, so follow-ups keep their topic."""
+    previous = [turn["content"] for turn in history[-2:] if turn.get("role") == "user" and isinstance(turn.get("content"), str)]
+    return " ".join(previous + [message])
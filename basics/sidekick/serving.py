@@ -0,0 +1,213 @@
+import gc
+import json
+import os
+import re
+import signal
+import socket
+import sys
+import time
+import traceback
+import zlib
+from urllib.parse import parse_qs
+
+_SESSION_PATH = re.compile(r"/(?:heartbeat|stream)/([^/]+)")
+# The routes whose JSON body, rather than their URL, carries the session_hash
+_BODY_SESSION_PATH = re.compile(r"/(?:queue/join|cancel)/?$")
+_HOP_HEADERS = {b"connection", b"keep-alive", b"transfer-encoding", b"upgrade"}
+
+# A worker that exits sooner than this after starting counts as crashing on start
+STABLE_SECONDS = 30.0
+MAX_QUICK_RESTARTS = 5
+
+
+def _bind(host, port, backlog=2048):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class SessionAffinity:
+    """ASGI middleware sending every request of a Gradio session to the worker that owns it.
+
+    Gradio keeps its queue in process memory, so a session's queue/join, queue/data and
+    heartbeat requests must all reach the same worker. Sessions are assigned by hashing
+    session_hash; requests for another worker's sessions are proxied to its private port.
+    """
+
+    def __init__(self, app, index, ports):
+        self.app = app
+        self.index = index
+        self.ports = ports
+        self._client = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        session, body, receive = await self._session(scope, receive)
+        owner = zlib.crc32(session.encode()) % len(self.ports) if session else self.index
+        if owner == self.index:
+            return await self.app(scope, receive, send)
+        await self._forward(scope, body, send, self.ports[owner])
+
+    async def _session(self, scope, receive):
+        session = parse_qs(scope.get("query_string", b"").decode()).get("session_hash", [None])[0]
+        if session:
+            return session, None, receive
+        match = _SESSION_PATH.search(scope["path"])
+        if match:
+            return match.group(1), None, receive
+        if scope["method"] != "POST" or not _BODY_SESSION_PATH.search(scope["path"]):
+            # Everything else, file uploads included, streams through without being buffered
+            return None, None, receive
+
+        # queue/join and cancel carry the session in their small JSON body; read it and replay it
+        chunks, more = [], True
+        while more:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        async def replay():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        try:
+            session = json.loads(body).get("session_hash")
+        except (ValueError, AttributeError):
+            session = None
+        return session, body, replay
+
+    async def _forward(self, scope, body, send, port):
+        import httpx
+
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=None))
+        headers = [(k, v) for k, v in scope["headers"] if k not in _HOP_HEADERS]
+        if scope.get("client") and not any(k == b"x-forwarded-for" for k, _ in headers):
+            headers.append((b"x-forwarded-for", scope["client"][0].encode()))
+        url = f"http://127.0.0.1:{port}{scope['raw_path'].decode() if scope.get('raw_path') else scope['path']}"
+        if scope.get("query_string"):
+            url += "?" + scope["query_string"].decode()
+        request = self._client.build_request(scope["method"], url, headers=headers, content=body or b"")
+        response = await self._client.send(request, stream=True)
+        try:
+            await send({
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [(k, v) for k, v in response.headers.raw if k.lower() not in _HOP_HEADERS],
+            })
+            async for chunk in response.aiter_raw():
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            await response.aclose()
+
+
+def _run_worker(app_factory, sockets, index, ports, log_level):
+    import uvicorn
+
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    app = SessionAffinity(app_factory(), index, ports)
+    server = uvicorn.Server(uvicorn.Config(app, log_level=log_level))
+    server.run(sockets=sockets)
+
+
+def serve(app_factory, host="localhost", port=7860, workers=1, log_level="info"):
+    """Serve app_factory() with uvicorn, forking `workers` processes that share one listening socket.
+
+    Anything loaded before calling serve() (the parsed profile, its index, imported modules) is
+    shared copy-on-write by the workers. app_factory runs in each worker after the fork, so
+    event loops, queues and threads are per worker, and SessionAffinity keeps each Gradio
+    session on one worker. Workers shut down through the app's lifespan, so per-worker
+    cleanup belongs in its shutdown handlers.
+
+    Crashed workers are restarted, after a delay that doubles each time a worker dies within
+    STABLE_SECONDS of starting. After MAX_QUICK_RESTARTS such crashes in a row, serve()
+    stops every worker and raises RuntimeError rather than keep forking.
+    """
+    if workers <= 1 or not hasattr(os, "fork"):
+        if workers > 1:
+            print("Forking workers isn't supported on this platform, serving from one process", flush=True)
+        import uvicorn
+
+        uvicorn.run(app_factory(), host=host, port=port, log_level=log_level)
+        return
+
+    sock = _bind(host, port)
+    # Each worker also listens privately so others can hand it requests for its sessions
+    private = [_bind("127.0.0.1", 0) for _ in range(workers)]
+    ports = [p.getsockname()[1] for p in private]
+    # Move everything loaded so far out of the GC's reach so collections don't dirty shared pages
+    gc.freeze()
+    children = {}
+    started = {}
+    quick_crashes = [0] * workers
+    stopping = False
+
+    def spawn(index):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                _run_worker(app_factory, [sock, private[index]], index, ports, log_level)
+                code = 0
+            except BaseException:
+                # _exit below leaves no chance for the interpreter to print it
+                traceback.print_exc()
+            finally:
+                # The app's shutdown handlers have run by now. _exit skips the atexit
+                # handlers copied from the parent, which aren't this worker's to run.
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(code)
+        children[pid] = index
+        started[index] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for index in range(workers):
+        spawn(index)
+    print(f"Serving on http://{host}:{port} with {workers} workers", flush=True)
+
+    failed = None
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        if time.monotonic() - started[index] < STABLE_SECONDS:
+            quick_crashes[index] += 1
+        else:
+            quick_crashes[index] = 0
+        if quick_crashes[index] > MAX_QUICK_RESTARTS:
+            failed = f"Worker {index} crashed {quick_crashes[index]} times in a row on start, last with status {status}"
+            print(f"{failed}; stopping", flush=True)
+            stop(None, None)
+            continue
+        delay = min(30.0, 0.5 * 2 ** (quick_crashes[index] - 1)) if quick_crashes[index] else 0.0
+        print(f"Worker {pid} exited with status {status}, restarting in {delay:.1f}s", flush=True)
+        time.sleep(delay)
+        if not stopping:
+            spawn(index)
+    for listener in [sock] + private:
+        listener.close()
+    if failed:
+        raise RuntimeError(failed)
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from sidekick.llm_executor import DeadlineExceeded
+from sidekick.metrics import STAGE_SECONDS, TOKENS, TOOL_ROUNDS, span
+from sidekick.retrieval import estimate_tokens
+
+
+def _merge_tool_call(calls, delta):
+    # Providers split a tool call across chunks by index; Gemini sends each call whole with no index
+    index = delta.index if delta.index is not None else len(calls)
+    call = calls.setdefault(index, {"id": "", "name": "", "arguments": ""})
+    if delta.id:
+        call["id"] = delta.id
+    if delta.function:
+        call["name"] += delta.function.name or ""
+        call["arguments"] += delta.function.arguments or ""
+
+
+def _count_tokens(usage, messages, content, calls):
+    if usage is not None:
+        TOKENS.inc(usage.prompt_tokens or 0, direction="in")
+        TOKENS.inc(usage.completion_tokens or 0, direction="out")
+        return
+    # Not every provider reports usage on streams, so fall back to an estimate
+    TOKENS.inc(sum(estimate_tokens(m["content"]) for m in messages if isinstance(m.get("content"), str)), direction="in")
+    TOKENS.inc(estimate_tokens(content + "".join(call["arguments"] for call in calls.values())), direction="out")
+
+
+async def _until(stream, deadline):
+    # The deadline only wraps each wait for a chunk, never the consumer's time at a yield
+    chunks = aiter(stream)
+    while True:
+        try:
+            chunk = await asyncio.wait_for(anext(chunks), max(0.0, deadline - time.monotonic()))
+        except StopAsyncIteration:
+            return
+        except TimeoutError:
+            await stream.close()
+            raise DeadlineExceeded("LLM turn deadline exceeded") from None
+        yield chunk
+
+
+async def stream_chat(executor, model, messages, tools, handle_tool_calls):
+    """Yield the reply text as it grows, running any tool call rounds in between.
+
+    handle_tool_calls is the blocking Me.handle_tool_calls and is run off the event loop.
+    The whole turn must finish within the executor's deadline or DeadlineExceeded is raised,
+    and after max_tool_rounds the model is asked to answer without calling tools.
+    """
+    deadline = executor.start_turn()
+    start = time.monotonic()
+    reply = ""
+    for tool_round in range(executor.max_tool_rounds + 1):
+        tool_choice = "auto" if tool_round < executor.max_tool_rounds else "none"
+        stream = await executor.create(deadline, model=model, messages=messages, tools=tools, tool_choice=tool_choice, stream=True)
+        content = ""
+        calls = {}
+        usage = None
+        async for chunk in _until(stream, deadline):
+            usage = getattr(chunk, "usage", None) or usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                if not reply:
+                    STAGE_SECONDS.observe(time.monotonic() - start, stage="first_token")
+                content += delta.content
+                reply += delta.content
+                yield reply
+            for tool_call in delta.tool_calls or []:
+                _merge_tool_call(calls, tool_call)
+        _count_tokens(usage, messages, content, calls)
+        if not calls:
+            TOOL_ROUNDS.observe(tool_round)
+            return
+        tool_calls = [
+            SimpleNamespace(id=call["id"] or f"call_{index}", function=SimpleNamespace(name=call["name"], arguments=call["arguments"] or "{}"))
+            for index, call in sorted(calls.items())
+        ]
+        messages.append({
+            "role": "assistant",
+            "content": content or None,
+            "tool_calls": [
+                {"id": call.id, "type": "function", "function": {"name": call.function.name, "arguments": call.function.arguments}}
+                for call in tool_calls
+            ],
+        })
+        with span("tool_round"):
+            messages.extend(await asyncio.to_thread(handle_tool_calls, tool_calls))
@@ -0,0 +1,91 @@
+import contextvars
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sidekick.metrics import ERRORS, span, trace_id
+
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "object": dict,
+    "array": list,
+}
+
+
+class ToolArgumentError(ValueError):
+    pass
+
+
+class ToolRegistry:
+    """Maps the OpenAI tool schemas in `tools` to their functions and runs a turn's calls concurrently."""
+
+    def __init__(self, tools, functions, timeout=10.0, max_workers=8):
+        self.schemas = {tool["function"]["name"]: tool["function"]["parameters"] for tool in tools}
+        missing = set(self.schemas) - set(functions)
+        if missing:
+            raise ValueError(f"No function registered for tools: {', '.join(sorted(missing))}")
+        self.functions = {name: functions[name] for name in self.schemas}
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    def validate(self, name, arguments):
+        """Parse a call's JSON arguments and check them against the tool's schema."""
+        schema = self.schemas.get(name)
+        if schema is None:
+            raise ToolArgumentError(f"Unknown tool {name}")
+        try:
+            arguments = json.loads(arguments or "{}")
+        except ValueError as e:
+            raise ToolArgumentError(f"Arguments for {name} are not valid JSON: {e}") from None
+        if not isinstance(arguments, dict):
+            raise ToolArgumentError(f"Arguments for {name} must be an object")
+        properties = schema.get("properties", {})
+        missing = [key for key in schema.get("required", []) if key not in arguments]
+        if missing:
+            raise ToolArgumentError(f"Missing arguments for {name}: {', '.join(missing)}")
+        for key, value in arguments.items():
+            if key not in properties:
+                if schema.get("additionalProperties", True) is False:
+                    raise ToolArgumentError(f"Unexpected argument for {name}: {key}")
+                continue
+            expected = _JSON_TYPES.get(properties[key].get("type"))
+            if expected and not isinstance(value, expected):
+                raise ToolArgumentError(f"Argument {key} for {name} must be {properties[key]['type']}")
+        return arguments
+
+    def _call(self, name, arguments):
+        with span(f"tool:{name}"):
+            return self.functions[name](**arguments)
+
+    def run(self, tool_calls):
+        """Run the calls of one turn in parallel and return tool messages in the original order."""
+        futures = []
+        for tool_call in tool_calls:
+            tool_name = tool_call.function.name
+            print(f"[{trace_id()}] Tool called: {tool_name}", flush=True)
+            try:
+                arguments = self.validate(tool_name, tool_call.function.arguments)
+            except ToolArgumentError as e:
+                ERRORS.inc(stage="tool_arguments")
+                futures.append((tool_call, None, {"error": str(e)}))
+                continue
+            # Run in a copy of this context so the call's span keeps the turn's trace ID
+            context = contextvars.copy_context()
+            futures.append((tool_call, self._executor.submit(context.run, self._call, tool_name, arguments), None))
+
+        deadline = time.monotonic() + self.timeout
+        results = []
+        for tool_call, future, result in futures:
+            if future is not None:
+                try:
+                    result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                except TimeoutError:
+                    ERRORS.inc(stage="tool_timeout")
+                    result = {"error": f"{tool_call.function.name} timed out"}
+                except Exception as e:
+                    result = {"error": f"{tool_call.function.name} failed: {e}"}
+            results.append({"role": "tool", "content": json.dumps(result), "tool_call_id": tool_call.id})
+        return results
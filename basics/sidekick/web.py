@@ -0,0 +1,83 @@
+import gradio as gr
+from fastapi import FastAPI, Request
+from fastapi.responses import PlainTextResponse, RedirectResponse
+
+from sidekick.geoip import GeoEnricher, client_ip
+from sidekick.me import routed_chat
+from sidekick.metrics import REGISTRY, new_trace
+
+
+def create_app(me, concurrency_limit=16, max_queue=64, personas=None, geo=True, metrics=True, notifier=None):
+    """The chat UI mounted in a FastAPI app, with optional geo-IP logging and a /metrics endpoint."""
+    # Create FastAPI app
+    app = FastAPI()
+
+    # Create Gradio interface. Past concurrency_limit chats run at once and max_queue waiting,
+    # Gradio turns new chats away with a fast 503 "Queue is full" instead of piling them up.
+    gradio_interface = gr.ChatInterface(routed_chat(me, personas), type="messages", concurrency_limit=concurrency_limit)
+    gradio_interface.queue(max_size=max_queue)
+
+    if personas is not None:
+        # /p/<slug> links open the chat page for that persona
+        @app.get("/p/{slug}")
+        async def persona_page(slug: str):
+            return RedirectResponse(f"/?persona={slug}")
+
+    if metrics:
+        REGISTRY.counter_from("sidekick_answer_cache_hits_total", "Answers served from the cache",
+                              lambda: me.answer_cache.hits)
+        REGISTRY.counter_from("sidekick_answer_cache_misses_total", "Answer cache lookups that missed",
+                              lambda: me.answer_cache.misses)
+        REGISTRY.counter_from("sidekick_answer_cache_saved_seconds_total", "LLM time saved by cached answers",
+                              lambda: round(me.answer_cache.latency_saved, 3))
+        if personas is not None:
+            REGISTRY.gauge("sidekick_personas_active", "Personas loaded in memory", lambda: personas.stats()["active"])
+            REGISTRY.gauge("sidekick_personas_active_bytes", "Approximate bytes held by loaded personas",
+                           lambda: personas.stats()["active_bytes"])
+            REGISTRY.counter_from("sidekick_personas_evictions_total", "Personas evicted to stay under the memory cap",
+                                  lambda: personas.stats()["evictions"])
+        if notifier is not None:
+            REGISTRY.gauge("sidekick_notifications_dropped", "Notifications dropped because the queue was full",
+                           lambda: notifier.dropped)
+
+        # Metrics are per process; with --workers each scrape reaches whichever worker accepts it
+        @app.get("/metrics")
+        async def metrics_page():
+            return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+    if notifier is not None:
+        # Deliver what's still queued when the app (or a forked worker) shuts down
+        app.add_event_handler("shutdown", lambda: notifier.flush(2.0))
+
+    if geo:
+        def log_location(ip, geo_data):
+            me.push(f"New request from IP: {ip}, Location: {geo_data.get('city', 'Unknown')}, "
+                    f"{geo_data.get('regionName', '')}, {geo_data.get('country', '')}")
+
+        enricher = GeoEnricher(log_location)
+        app.add_event_handler("shutdown", enricher.aclose)
+
+        # Middleware to capture IP & location, looked up off the request path
+        @app.middleware("http")
+        async def log_ip_and_location(request: Request, call_next):
+            try:
+                if enricher.should_enrich(request):
+                    enricher.schedule(client_ip(request))
+            except Exception as e:
+                # Location logging is best effort and never fails the request itself
+                print(f"Geo-IP enrichment not scheduled: {e!r}", flush=True)
+            return await call_next(request)
+
+    # Added last, so it runs first: every stage of a request, the geo-IP lookup and push
+    # included, logs under the request's trace ID
+    @app.middleware("http")
+    async def start_trace(request: Request, call_next):
+        request_id = request.headers.get("x-request-id")
+        trace = new_trace(request_id)
+        if request_id is None:
+            # The chat reads its trace ID from the request Gradio hands it
+            request.scope["headers"] = [*request.scope["headers"], (b"x-request-id", trace.encode())]
+        return await call_next(request)
+
+    # Mount Gradio inside FastAPI
+    return gr.mount_gradio_app(app, gradio_interface, path="")
@@ -1,7 +1,10 @@
 from crewai import Agent, Crew, Process, Task
+from crewkit.ledger import accounted
+from crewkit.stream import streamed
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
+from coder.tools.sandbox import SandboxedPythonTool
 
 
 @CrewBase
@@ -11,27 +14,30 @@ class Coder():
     agents_config = "config/agents.yaml"
     tasks_config = "config/tasks.yaml"
 
+    def __init__(self):
+        # Runs code in warm, isolated local workers instead of crewAI's per-run Docker sandbox
+        self.sandbox = SandboxedPythonTool()
+
     @agent
     def coder(self) -> Agent:
         return Agent(
             config=self.agents_config["coder"],
             verbose=True,
-            # allow_code_execution=True,
-            # max_execution_time=30,
-            # code_execution_mode="safe",
-            # max_retry_limit=3
+            tools=[self.sandbox],
+            max_retry_limit=3
             )
     
     @task
     def coding_task(self) -> Task:
-        return Task(config=self.tasks_config["coding_task"])
+        # output/code_and_output.txt holds the answer's final code with the output it really printed
+        return Task(config=self.tasks_config["coding_task"], callback=self.sandbox.write_artifact)
     
 
     @crew
     def crew(self) -> Crew:
-        return Crew(
+        return streamed(accounted(Crew(
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
             verbose=True
-        )
\ No newline at end of file
+        )))
\ No newline at end of file
@@ -5,6 +5,7 @@ import os
 
 from datetime import datetime
 
+from crewkit.stream import STREAM_ENV
 from coder.crew import Coder
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
@@ -28,3 +29,11 @@ def run():
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
 
+
+def stream():
+    """
+    Run the crew, writing each task's tokens to its output file + ".partial" and to
+    output/stream.jsonl as they are generated.
+    """
+    os.environ.setdefault(STREAM_ENV, "output/stream.jsonl")
+    run()
@@ -0,0 +1,228 @@
+import atexit
+import json
+import os
+import queue
+import re
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, PrivateAttr
+
+WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+ARTIFACT_PATH = "output/code_and_output.txt"
+
+_CODE_BLOCK = re.compile(r"```(?:python|py)?[ \t]*\n(.*?)```", re.DOTALL)
+
+
+def final_code(answer):
+    """The last fenced code block in an agent's answer, or None if it has none."""
+    blocks = _CODE_BLOCK.findall(answer or "")
+    return blocks[-1].strip() if blocks else None
+
+
+class SandboxUnavailable(RuntimeError):
+    """The workers can't isolate submitted code on this host, so they won't run any."""
+
+
+@dataclass
+class ExecutionResult:
+    stdout: str
+    stderr: str
+    exit_code: int
+    timed_out: bool
+    truncated: bool
+    seconds: float
+
+    def summary(self):
+        if self.timed_out:
+            status = f"Timed out after {self.seconds:.1f}s"
+        elif self.exit_code < 0:
+            status = f"Killed by signal {-self.exit_code} (CPU or memory limit) after {self.seconds:.2f}s"
+        else:
+            status = f"Exit code {self.exit_code} in {self.seconds:.2f}s"
+        if self.truncated:
+            status += ", output truncated"
+        return f"{status}\n\nstdout:\n{self.stdout or '(empty)'}\n\nstderr:\n{self.stderr or '(empty)'}"
+
+
+class _Worker:
+    def __init__(self):
+        # -I drops PYTHON* variables and user site-packages; the environment carries no API keys
+        self.process = subprocess.Popen(
+            [sys.executable, "-I", WORKER],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+            env={"PATH": os.defpath, "LANG": "C.UTF-8", "PYTHONIOENCODING": "utf-8"},
+        )
+        # The worker first checks it can isolate children, and refuses to run anything if not
+        ready = json.loads(self.process.stdout.readline() or '{"ready": false, "error": "worker exited"}')
+        if not ready["ready"]:
+            self.close()
+            raise SandboxUnavailable(ready["error"])
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def run(self, request, on_output):
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        chunks = {"stdout": [], "stderr": []}
+        for line in self.process.stdout:
+            message = json.loads(line)
+            if "stream" in message:
+                chunks[message["stream"]].append(message["data"])
+                if on_output:
+                    on_output(message["stream"], message["data"])
+                continue
+            return ExecutionResult("".join(chunks["stdout"]), "".join(chunks["stderr"]), message["exit_code"],
+                                   message["timed_out"], message["truncated"], message["seconds"])
+        raise RuntimeError("Sandbox worker exited")
+
+    def close(self):
+        if self.alive():
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class SandboxPool:
+    """Pre-started Python workers that run submitted code in fresh, resource-limited children.
+
+    Each worker forks a child per submission with CPU, memory, file size and open file
+    rlimits, so the per-run cost is a fork rather than an interpreter start. The child
+    runs in its own network namespace, can only write inside a temporary working directory,
+    can't start processes, signal others or load native code. Linux only: workers that
+    can't create a network namespace raise SandboxUnavailable rather than run code without one.
+    """
+
+    def __init__(self, size=2, timeout=30, cpu_seconds=10, memory_mb=512, file_mb=16, output_limit=64 * 1024):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("SandboxPool needs os.fork, which this platform doesn't have")
+        self.defaults = {"timeout": timeout, "cpu_seconds": cpu_seconds, "memory_mb": memory_mb, "file_mb": file_mb,
+                         "output_limit": output_limit}
+        self._idle = queue.Queue()
+        self._workers = [_Worker() for _ in range(size)]
+        for worker in self._workers:
+            self._idle.put(worker)
+        atexit.register(self.close)
+
+    def run(self, code, on_output=None, **limits):
+        """Run code in a warm worker and return its ExecutionResult.
+
+        on_output(stream, text) is called with each chunk of stdout or stderr as it arrives.
+        """
+        request = dict(self.defaults, **limits, code=code)
+        worker = self._idle.get()
+        try:
+            if not worker.alive():
+                worker = self._replace(worker)
+            return worker.run(request, on_output)
+        except SandboxUnavailable:
+            raise
+        except (OSError, RuntimeError, ValueError):
+            # A worker that broke mid-request is replaced; the submission is reported as failed
+            worker = self._replace(worker)
+            raise
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        for worker in self._workers:
+            worker.close()
+
+    def _replace(self, worker):
+        worker.close()
+        fresh = _Worker()
+        self._workers[self._workers.index(worker)] = fresh
+        return fresh
+
+
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool():
+    """The process-wide SandboxPool, started on first use."""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = SandboxPool()
+        return _shared_pool
+
+
+class SandboxedPythonInput(BaseModel):
+    """Input schema for SandboxedPythonTool."""
+    code: str = Field(..., description="A complete Python 3 program. Print anything you want to see.")
+
+
+class SandboxedPythonTool(BaseTool):
+    name: str = "Run Python code"
+    description: str = (
+        "Runs a complete Python program in a sandbox and returns its exit code, stdout and stderr. "
+        "Only the standard library is available, with no network access, no subprocesses, "
+        "no files outside its working directory and limited CPU time and memory."
+    )
+    args_schema: Type[BaseModel] = SandboxedPythonInput
+    pool: Any = Field(default=None, exclude=True)
+    artifact_path: str = ARTIFACT_PATH
+    stream_output: bool = True
+
+    _runs: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _runs_lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def _execute(self, code):
+        on_output = None
+        if self.stream_output:
+            def on_output(stream, text):
+                print(text, end="", file=sys.stderr if stream == "stderr" else sys.stdout, flush=True)
+        result = (self.pool or shared_pool()).run(code, on_output=on_output)
+        with self._runs_lock:
+            # Kept so the final answer's code can be matched to the output it really produced
+            self._runs[code.strip()] = result
+            self._runs.move_to_end(code.strip())
+            while len(self._runs) > 32:
+                self._runs.popitem(last=False)
+        return result
+
+    def _run(self, code: str) -> str:
+        return self._execute(code).summary()
+
+    def write_artifact(self, output):
+        """Task callback writing artifact_path from the final code in the task's answer.
+
+        The agent may have run test snippets along the way, so the artifact is the answer's
+        last code block with the output it printed: recorded if that exact program was run,
+        otherwise from running it now. An answer without code, or whose code can't be run
+        here, is written as it is.
+        """
+        answer = getattr(output, "raw", output)
+        code = final_code(answer)
+        if code is None:
+            self._write(answer)
+            return
+        with self._runs_lock:
+            result = self._runs.get(code)
+        if result is None:
+            try:
+                result = self._execute(code)
+            except (RuntimeError, OSError, ValueError) as e:
+                # crewAI fails the task if its callback raises; keep the answer rather than lose the run
+                self._write(f"{answer.rstrip()}\n\n(Not re-executed: {e})\n")
+                return
+        output = result.stdout + (f"\n{result.stderr}" if result.stderr else "")
+        self._write(f"```python\n{code}\n```\n\nOutput of the code when executed:\n\n```\n{output.rstrip()}\n```\n")
+
+    def _write(self, content):
+        directory = os.path.dirname(self.artifact_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.artifact_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp, self.artifact_path)
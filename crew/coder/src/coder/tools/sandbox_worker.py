@@ -0,0 +1,240 @@
+"""A warm sandbox worker, run by SandboxPool as `python -I sandbox_worker.py`.
+
+Reads one JSON request per line from stdin, forks a child per request to run the code
+and writes JSON lines back on stdout: output chunks as they arrive, then the result.
+Forking from this already-initialised, single-threaded interpreter costs a few
+milliseconds, and each child starts clean, with its own CPU clock for RLIMIT_CPU.
+
+Each child gets an empty network namespace of its own, and the worker refuses to run
+anything where one can't be created. An audit hook then blocks sockets, new processes,
+signals to other processes and ctypes, and confines file writes to the child's
+temporary directory and reads to it and the standard library.
+"""
+import json
+import os
+import resource
+import selectors
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+CLONE_NEWUSER = 0x10000000
+CLONE_NEWNET = 0x40000000
+
+# Audit events a sandboxed program may not raise: no network, no new processes, no signals
+# to other processes and no foreign function calls, which would bypass every other check
+_BLOCKED_EVENTS = ("socket.", "subprocess.Popen", "os.system", "os.exec", "os.posix_spawn", "os.spawn",
+                   "os.fork", "os.forkpty", "pty.spawn", "os.kill", "os.killpg", "signal.pthread_kill",
+                   "signal.pidfd_send_signal", "ctypes.", "sys.addaudithook")
+# Modules that start processes, call C functions or run code in a subinterpreter, which has
+# no audit hooks, without raising the events above
+_BLOCKED_IMPORTS = {"_posixsubprocess", "_ctypes", "ctypes", "_testcapi", "_xxsubinterpreters", "_interpreters"}
+# Audit events whose path arguments must stay inside the working directory
+_PATH_EVENTS = {
+    "os.chdir", "os.chmod", "os.chown", "os.link", "os.mkdir", "os.remove", "os.rename", "os.rmdir",
+    "os.symlink", "os.truncate", "os.utime", "os.chflags", "os.lchflags", "os.setxattr", "os.removexattr",
+    "shutil.chown", "shutil.copyfile", "shutil.copymode", "shutil.copystat", "shutil.copytree", "shutil.move",
+    "shutil.rmtree", "shutil.make_archive", "shutil.unpack_archive",
+}
+# Audit events that only read, allowed anywhere under _READABLE too
+_READ_EVENTS = {"os.listdir", "os.scandir", "os.listxattr", "os.getxattr", "glob.glob", "glob.glob/2"}
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT | os.O_TRUNC
+_DEVICES = ("/dev/null", "/dev/zero", "/dev/urandom", "/dev/random")
+
+# Set in the child: its working directory, and where it may read (the standard library)
+_WORKDIR = None
+_READABLE = ()
+
+
+def _inside(path, roots):
+    if isinstance(path, int):
+        # An already open descriptor; opening it was checked
+        return True
+    path = os.path.realpath(os.fsdecode(path))
+    return path in _DEVICES or any(path == root or path.startswith(root + os.sep) for root in roots)
+
+
+def _audit(event, args):
+    if event.startswith(_BLOCKED_EVENTS):
+        raise PermissionError(f"{event} is not allowed in the sandbox")
+    if event == "import" and args[0].partition(".")[0] in _BLOCKED_IMPORTS:
+        raise PermissionError(f"Importing {args[0]} is not allowed in the sandbox")
+    if event == "open":
+        path, mode, flags = args
+        writing = (mode is not None and any(c in mode for c in "wax+")) or (flags or 0) & _WRITE_FLAGS
+        if path is not None and not _inside(path, (_WORKDIR,) if writing else (_WORKDIR, *_READABLE)):
+            raise PermissionError(f"{os.fsdecode(path)} is outside the sandbox's working directory")
+    elif event in _PATH_EVENTS or event in _READ_EVENTS:
+        roots = (_WORKDIR, *_READABLE) if event in _READ_EVENTS else (_WORKDIR,)
+        for arg in args:
+            if isinstance(arg, (str, bytes, os.PathLike)) and not _inside(arg, roots):
+                raise PermissionError(f"{os.fsdecode(arg)} is outside the sandbox's working directory")
+
+
+def _unshare_network():
+    """Move this process into a new, empty network namespace, or raise OSError."""
+    import ctypes
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    if not hasattr(libc, "unshare"):
+        # Not Linux: there are no namespaces to isolate children with
+        raise OSError(0, f"unshare isn't available on {sys.platform}")
+    # Root can create a network namespace directly; other users need a user namespace too
+    for flags in (CLONE_NEWNET, CLONE_NEWUSER | CLONE_NEWNET):
+        if libc.unshare(flags) == 0:
+            return
+    errno = ctypes.get_errno()
+    raise OSError(errno, f"can't create a network namespace: {os.strerror(errno)}")
+
+
+def _limit(name, value):
+    try:
+        resource.setrlimit(getattr(resource, name), (value, value))
+    except (AttributeError, ValueError, OSError):
+        pass
+
+
+def _child(request, workdir, stdout, stderr):
+    os.dup2(stdout, 1)
+    os.dup2(stderr, 2)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.closerange(3, 256)
+    os.chdir(workdir)
+    os.setsid()
+    try:
+        _unshare_network()
+    except OSError as e:
+        # No network isolation, no run: the audit hook alone doesn't stop native code
+        os.write(2, f"Sandbox unavailable: {e}\n".encode())
+        os._exit(126)
+    # Loaded just now for unshare; dropped so importing them again goes through the audit hook
+    for name in [name for name in sys.modules if name.partition(".")[0] in _BLOCKED_IMPORTS]:
+        del sys.modules[name]
+    _limit("RLIMIT_CPU", request["cpu_seconds"])
+    _limit("RLIMIT_AS", request["memory_mb"] * 2 ** 20)
+    _limit("RLIMIT_FSIZE", request["file_mb"] * 2 ** 20)
+    _limit("RLIMIT_NOFILE", 64)
+    _limit("RLIMIT_CORE", 0)
+    sys.stdin = open(os.devnull)
+    sys.stdout = open(1, "w", buffering=1, encoding="utf-8", errors="replace", closefd=False)
+    sys.stderr = open(2, "w", buffering=1, encoding="utf-8", errors="replace", closefd=False)
+    sys.argv = ["main.py"]
+    os.environ["TMPDIR"] = workdir
+    tempfile.tempdir = workdir
+    global _WORKDIR, _READABLE
+    _WORKDIR = os.path.realpath(workdir)
+    _READABLE = tuple({os.path.realpath(p) for p in (sys.prefix, sys.base_prefix, sys.exec_prefix)})
+    sys.addaudithook(_audit)
+
+    code = 0
+    try:
+        exec(compile(request["code"], "main.py", "exec"), {"__name__": "__main__", "__builtins__": __builtins__})
+    except SystemExit as e:
+        code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        if not isinstance(e.code, (int, type(None))):
+            print(e.code, file=sys.stderr)
+    except BaseException:
+        # Hide this file's frames so the traceback starts at the submitted code
+        exc_type, exc, tb = sys.exc_info()
+        traceback.print_exception(exc_type, exc, tb.tb_next)
+        code = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(code)
+
+
+def _send(message):
+    sys.stdout.write(json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+def _run(request):
+    workdir = tempfile.mkdtemp(prefix="sandbox-")
+    out_read, out_write = os.pipe()
+    err_read, err_write = os.pipe()
+    start = time.monotonic()
+    pid = os.fork()
+    if pid == 0:
+        os.close(out_read)
+        os.close(err_read)
+        _child(request, workdir, out_write, err_write)
+    os.close(out_write)
+    os.close(err_write)
+
+    selector = selectors.DefaultSelector()
+    selector.register(out_read, selectors.EVENT_READ, "stdout")
+    selector.register(err_read, selectors.EVENT_READ, "stderr")
+    deadline = start + request["timeout"]
+    budget = request["output_limit"]
+    timed_out = truncated = False
+    open_streams = 2
+    while open_streams:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                # The child hasn't called setsid yet
+                os.kill(pid, signal.SIGKILL)
+            break
+        for key, _ in selector.select(timeout=remaining):
+            data = os.read(key.fd, 65536)
+            if not data:
+                selector.unregister(key.fd)
+                open_streams -= 1
+                continue
+            # Keep draining past the limit so the child never blocks on a full pipe
+            if budget > 0:
+                text = data[:budget].decode("utf-8", errors="replace")
+                budget -= len(data)
+                _send({"stream": key.data, "data": text})
+            elif not truncated:
+                truncated = True
+    selector.close()
+    os.close(out_read)
+    os.close(err_read)
+    _, status = os.waitpid(pid, 0)
+    shutil.rmtree(workdir, ignore_errors=True)
+    if os.WIFSIGNALED(status):
+        exit_code = -os.WTERMSIG(status)
+    else:
+        exit_code = os.WEXITSTATUS(status)
+    _send({"exit_code": exit_code, "timed_out": timed_out, "truncated": truncated or budget < 0,
+           "seconds": round(time.monotonic() - start, 4)})
+
+
+def _probe():
+    """Why children can't be isolated here, or None when they can."""
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _unshare_network()
+        except Exception:
+            os._exit(1)
+        os._exit(0)
+    _, status = os.waitpid(pid, 0)
+    if os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0:
+        return None
+    return ("the sandbox needs network and user namespaces (unshare), which this system doesn't allow; "
+            "enable unprivileged user namespaces or run the crew where they are available")
+
+
+def main():
+    # Pay for common imports once here, not in every child
+    import collections, datetime, decimal, fractions, itertools, math, random, re, statistics, string  # noqa: F401
+
+    error = _probe()
+    _send({"ready": error is None, "error": error})
+    if error:
+        return
+    for line in sys.stdin:
+        _run(json.loads(line))
+
+
+if __name__ == "__main__":
+    main()
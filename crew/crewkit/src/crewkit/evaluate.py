@@ -0,0 +1,125 @@
+import importlib
+import json
+import multiprocessing
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+
+def _p90(values):
+    # Interpolated between samples, like the median, rather than rounded to one of a few scores
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=10, method="inclusive")[-1]
+
+
+def describe(values):
+    """Mean, variance and percentiles of a list of numbers, or None when it's empty."""
+    if not values:
+        return None
+    return {
+        "mean": round(statistics.fmean(values), 3),
+        "variance": round(statistics.variance(values), 3) if len(values) > 1 else 0.0,
+        "min": min(values),
+        "p50": statistics.median(values),
+        "p90": round(_p90(values), 3),
+        "max": max(values),
+    }
+
+
+def _load(crew_class):
+    module, _, name = crew_class.partition(":")
+    return getattr(importlib.import_module(module), name)
+
+
+def run_iteration(crew_class, iteration, eval_llm, inputs):
+    """Kick off a fresh crew once, scoring each task with crewAI's CrewEvaluator.
+
+    Runs in a worker process: CrewEvaluator keeps its scores in class attributes, so
+    iterations can't share a process without mixing their results.
+    """
+    from crewai.utilities.evaluators.crew_evaluator_handler import CrewEvaluator
+    from crewai.utilities.llm_utils import create_llm
+
+    crew = _load(crew_class)().crew()
+    evaluator = CrewEvaluator(crew, create_llm(eval_llm))
+    evaluator.set_iteration(iteration)
+    start = time.perf_counter()
+    output = crew.kickoff(inputs=inputs)
+    seconds = time.perf_counter() - start
+    return {
+        "iteration": iteration,
+        "seconds": round(seconds, 3),
+        "task_scores": list(evaluator.tasks_scores[iteration]),
+        "task_seconds": [round(t, 3) for t in evaluator.run_execution_times[iteration]],
+        "tokens": output.token_usage.model_dump() if output.token_usage else {},
+    }
+
+
+def evaluate(crew_class, n_iterations, eval_llm, inputs=None, workers=4, output_dir="output"):
+    """Run n_iterations of a crew across `workers` processes and summarise their scores.
+
+    crew_class is an import path such as "stock_picker.crew:StockPicker". Per-iteration
+    results and the summary are written to output_dir/evaluation-<time>.json, whose path
+    is returned along with the summary.
+    """
+    if n_iterations < 1:
+        raise ValueError(f"n_iterations must be at least 1, got {n_iterations}")
+    inputs = inputs or {}
+    results, failures = [], []
+    start = time.perf_counter()
+    # Spawned workers start clean rather than inheriting crewAI's threads through fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=min(workers, n_iterations), mp_context=context) as pool:
+        futures = {pool.submit(run_iteration, crew_class, i, eval_llm, inputs): i for i in range(1, n_iterations + 1)}
+        for future in as_completed(futures):
+            iteration = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                failures.append({"iteration": iteration, "error": str(e)})
+                print(f"Iteration {iteration} failed: {e}", flush=True)
+                continue
+            results.append(result)
+            print(f"Iteration {iteration} finished in {result['seconds']:.1f}s, "
+                  f"scores {result['task_scores']}", flush=True)
+    elapsed = time.perf_counter() - start
+
+    results.sort(key=lambda r: r["iteration"])
+    n_tasks = max((len(r["task_scores"]) for r in results), default=0)
+    summary = {
+        "crew": crew_class,
+        "eval_llm": eval_llm,
+        "iterations": n_iterations,
+        "completed": len(results),
+        "failed": len(failures),
+        "workers": workers,
+        "wall_seconds": round(elapsed, 3),
+        "crew_score": describe([statistics.fmean(r["task_scores"]) for r in results if r["task_scores"]]),
+        "task_scores": [describe([r["task_scores"][i] for r in results if len(r["task_scores"]) > i])
+                        for i in range(n_tasks)],
+        "seconds": describe([r["seconds"] for r in results]),
+        "total_tokens": describe([r["tokens"].get("total_tokens", 0) for r in results]),
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"evaluation-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"summary": summary, "iterations": results, "failures": failures}, f, indent=2)
+    print_summary(summary)
+    print(f"Results saved to {path}")
+    return summary, path
+
+
+def print_summary(summary):
+    print(f"\n{summary['completed']}/{summary['iterations']} iterations in {summary['wall_seconds']:.0f}s "
+          f"with {summary['workers']} workers, judged by {summary['eval_llm']}\n")
+    rows = [(f"Task {i + 1} score", stats) for i, stats in enumerate(summary["task_scores"])]
+    rows += [("Crew score", summary["crew_score"]), ("Seconds", summary["seconds"]),
+             ("Total tokens", summary["total_tokens"])]
+    print(f"{'':>16} {'mean':>10} {'variance':>10} {'p50':>10} {'p90':>10} {'max':>10}")
+    for label, stats in rows:
+        if stats:
+            print(f"{label:>16} " + " ".join(f"{stats[k]:>10.2f}" for k in ("mean", "variance", "p50", "p90", "max")))
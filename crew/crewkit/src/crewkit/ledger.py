@@ -0,0 +1,457 @@
+"""Token, latency and tool-call accounting for crew runs, with hard budgets.
+
+Every LLM call, tool call, agent step and task of an attached crew is appended to a
+JSON-lines ledger (output/ledger.jsonl, or CREW_LEDGER), followed by one "run" record
+with the totals when the kickoff ends. Every record is flat and carries the run_id,
+crew and kind, so nightly ledgers aggregate with a group-by:
+
+    python -m crewkit.ledger output/ledger.jsonl
+
+Tokens are read from each agent's own counter, which crewAI adds every call's usage to.
+A run's totals are exact. An LLM call's tokens are the growth of its agent's counter
+while it ran, so when one agent has calls in flight at once (its tasks running with
+async_execution), those calls and their tasks' rows may each include the others' tokens.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+import weakref
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from crewai.utilities.events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+from crewai.utilities.events.base_event_listener import BaseEventListener
+from crewai.utilities.events.crew_events import (
+    CrewKickoffCompletedEvent,
+    CrewKickoffFailedEvent,
+    CrewKickoffStartedEvent,
+)
+from crewai.utilities.events.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+from crewai.utilities.events.tool_usage_events import (
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    ToolUsageStartedEvent,
+)
+
+LEDGER_ENV = "CREW_LEDGER"
+MAX_TOKENS_ENV = "CREW_MAX_TOKENS"
+MAX_SECONDS_ENV = "CREW_MAX_SECONDS"
+MAX_TOOL_CALLS_ENV = "CREW_MAX_TOOL_CALLS"
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+def _env_number(name, kind):
+    value = os.getenv(name)
+    return kind(value) if value else None
+
+
+class Budget:
+    """Hard limits for one kickoff. None means unlimited."""
+
+    def __init__(self, tokens=None, seconds=None, tool_calls=None):
+        self.tokens = tokens
+        self.seconds = seconds
+        self.tool_calls = tool_calls
+
+    @classmethod
+    def from_env(cls):
+        return cls(_env_number(MAX_TOKENS_ENV, int), _env_number(MAX_SECONDS_ENV, float),
+                   _env_number(MAX_TOOL_CALLS_ENV, int))
+
+    def as_dict(self):
+        return {"tokens": self.tokens, "seconds": self.seconds, "tool_calls": self.tool_calls}
+
+    def check(self, tokens, seconds, tool_calls):
+        """A description of the first limit that's been passed, or None."""
+        if self.tokens is not None and tokens > self.tokens:
+            return f"token budget of {self.tokens} exceeded ({tokens} used)"
+        if self.seconds is not None and seconds > self.seconds:
+            return f"time budget of {self.seconds:g}s exceeded ({seconds:.1f}s elapsed)"
+        if self.tool_calls is not None and tool_calls > self.tool_calls:
+            return f"tool call budget of {self.tool_calls} exceeded ({tool_calls} calls)"
+        return None
+
+
+def _tokens(agent):
+    # Only this agent's calls add to it; see the module docstring for overlapping calls
+    usage = agent._token_process
+    return usage.prompt_tokens, usage.completion_tokens
+
+
+def _new_totals():
+    return {"seconds": 0.0, "llm_calls": 0, "llm_seconds": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+            "tool_calls": 0, "tool_seconds": 0.0, "steps": 0, "retries": 0, "errors": 0}
+
+
+class _Run:
+    """The accounting state of one kickoff of an attached crew."""
+
+    def __init__(self, crew, budget):
+        self.crew = crew
+        self.budget = budget
+        self.agents = {str(agent.id): agent for agent in crew.agents}
+        self.run_id = None
+        self.active = False
+        self.start = None
+        self.inputs = None
+        self.stopped = None
+        self.tasks = {}
+        self.current_task = {}
+        self.llm_started = {}
+        self.tool_started = {}
+        self.failed = set()
+        self.tokens_at_start = {}
+        self.retry_limits = {}
+        self.totals = _new_totals()
+        self.lock = threading.Lock()
+
+    def begin(self, inputs):
+        with self.lock:
+            self.run_id = uuid.uuid4().hex[:12]
+            self.active = True
+            self.start = time.perf_counter()
+            self.inputs = inputs
+            self.stopped = None
+            self.tasks = {}
+            self.totals = _new_totals()
+            self.tokens_at_start = {key: _tokens(agent) for key, agent in self.agents.items()}
+
+    def token_totals(self):
+        """Prompt and completion tokens used by the crew's agents since the kickoff began."""
+        prompt_used = completion_used = 0
+        for key, agent in self.agents.items():
+            prompt, completion = _tokens(agent)
+            start_prompt, start_completion = self.tokens_at_start.get(key, (0, 0))
+            prompt_used += prompt - start_prompt
+            completion_used += completion - start_completion
+        return prompt_used, completion_used
+
+    def tokens_used(self):
+        return sum(self.token_totals())
+
+    def stop_retries(self):
+        # Called with self.lock held. Each agent's own limit is kept to restore after the kickoff
+        for key, agent in self.agents.items():
+            self.retry_limits.setdefault(key, agent.max_retry_limit)
+            agent.max_retry_limit = 0
+
+    def restore_retries(self):
+        # Called with self.lock held
+        for key, limit in self.retry_limits.items():
+            self.agents[key].max_retry_limit = limit
+        self.retry_limits = {}
+
+    def elapsed(self):
+        return time.perf_counter() - self.start if self.start is not None else 0.0
+
+    def add(self, task_name, **amounts):
+        # Called with self.lock held
+        task = self.tasks.setdefault(task_name, _new_totals())
+        for key, amount in amounts.items():
+            task[key] += amount
+            self.totals[key] += amount
+
+
+class Ledger(BaseEventListener):
+    """Appends the LLM calls, tool calls, steps and tasks of attached crews to a JSON-lines file.
+
+    After each kickoff a summary table is printed and a "run" record with the totals is
+    written. A Budget given to attach() is checked after every agent step; once a limit
+    is passed the step raises BudgetExceeded, which stops the kickoff.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path="output/ledger.jsonl", echo=True):
+        self.path = path
+        self.echo = echo
+        # Kickoffs in progress. Attached crews between kickoffs are only held weakly: their
+        # agents' step callbacks keep the _Run alive exactly as long as the crew's agents
+        self._runs = []
+        self._attached = weakref.WeakValueDictionary()
+        self._file = None
+        self._lock = threading.Lock()
+        super().__init__()
+
+    @classmethod
+    def shared(cls, path="output/ledger.jsonl"):
+        # Listeners stay registered on crewAI's global event bus, so one per process and file
+        key = os.path.abspath(path)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(path)
+            return cls._shared[key]
+
+    def attach(self, crew, budget=None):
+        """Account for the crew's kickoffs, stopping them at the budget. Returns the crew."""
+        run = _Run(crew, budget or Budget())
+        for agent in crew.agents:
+            agent.step_callback = self._step_callback(run, agent, agent.step_callback)
+        with self._lock:
+            self._attached[id(crew)] = run
+        return crew
+
+    def _run_for_crew(self, crew):
+        with self._lock:
+            run = self._attached.get(id(crew))
+        return run if run is not None and run.crew is crew else None
+
+    def _run_for_tool(self, agent_key):
+        # Tool events name the agent by key, which changes as its prompts are interpolated
+        with self._lock:
+            runs = [run for run in self._runs if run.active]
+        for run in runs:
+            for agent_id, agent in run.agents.items():
+                if agent.key == agent_key:
+                    return run, agent_id
+        return None, None
+
+    def _run_for_agent(self, agent_id):
+        if agent_id is None:
+            return None
+        agent_id = str(agent_id)
+        with self._lock:
+            return next((run for run in self._runs if run.active and agent_id in run.agents), None)
+
+    def _write(self, run, kind, **fields):
+        record = {"ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"), "run_id": run.run_id,
+                  "crew": run.crew.name, "kind": kind, **fields}
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self._file.write(json.dumps(record, default=str) + "\n")
+        return record
+
+    def _step_callback(self, run, agent, previous):
+        agent_id = str(agent.id)
+
+        def on_step(step):
+            if previous is not None:
+                previous(step)
+            with run.lock:
+                task_name = run.current_task.get(agent_id)
+                run.add(task_name, steps=1)
+                tokens, tool_calls = run.tokens_used(), run.totals["tool_calls"]
+            elapsed = run.elapsed()
+            self._write(run, "step", task=task_name, agent=agent.role, step=type(step).__name__,
+                        tool=getattr(step, "tool", None), tokens=tokens, seconds=round(elapsed, 3))
+            problem = run.budget.check(tokens, elapsed, tool_calls)
+            if problem is not None:
+                with run.lock:
+                    run.stopped = problem
+                    # crewAI retries a failed agent execution, which would spend more of the budget
+                    run.stop_retries()
+                raise BudgetExceeded(f"Stopping {run.crew.name}: {problem}")
+
+        return on_step
+
+    def setup_listeners(self, crewai_event_bus):
+        @crewai_event_bus.on(CrewKickoffStartedEvent)
+        def on_kickoff_started(source, event):
+            run = self._run_for_crew(source)
+            if run is not None:
+                run.begin(event.inputs)
+                with self._lock:
+                    if run not in self._runs:
+                        self._runs.append(run)
+
+        @crewai_event_bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            agent = getattr(event.task, "agent", None)
+            run = self._run_for_agent(getattr(agent, "id", None))
+            if run is None:
+                return
+            name = event.task.name or str(event.task.id)
+            with run.lock:
+                run.current_task[str(agent.id)] = name
+                run.tasks.setdefault(name, _new_totals())["started"] = time.perf_counter()
+
+        @crewai_event_bus.on(LLMCallStartedEvent)
+        def on_llm_started(source, event):
+            run = self._run_for_agent(event.agent_id)
+            if run is None:
+                return
+            key = (str(event.agent_id), threading.get_ident())
+            run.llm_started[key] = (time.perf_counter(), _tokens(run.agents[str(event.agent_id)]), event.model)
+
+        def finish_llm(event, error=None):
+            run = self._run_for_agent(event.agent_id)
+            if run is None:
+                return
+            key = (str(event.agent_id), threading.get_ident())
+            started = run.llm_started.pop(key, None)
+            if started is None:
+                return
+            start, (prompt_before, completion_before), model = started
+            seconds = time.perf_counter() - start
+            prompt, completion = _tokens(run.agents[str(event.agent_id)])
+            with run.lock:
+                retry = key in run.failed
+                if error is None:
+                    run.failed.discard(key)
+                else:
+                    run.failed.add(key)
+                task_name = event.task_name or run.current_task.get(str(event.agent_id))
+                run.add(task_name, llm_calls=1, llm_seconds=seconds, prompt_tokens=prompt - prompt_before,
+                        completion_tokens=completion - completion_before, retries=int(retry),
+                        errors=int(error is not None))
+            self._write(run, "llm_call", task=task_name, agent=event.agent_role, model=model, seconds=round(seconds, 3),
+                        prompt_tokens=prompt - prompt_before, completion_tokens=completion - completion_before,
+                        retry=retry, error=error)
+
+        @crewai_event_bus.on(LLMCallCompletedEvent)
+        def on_llm_completed(source, event):
+            finish_llm(event)
+
+        @crewai_event_bus.on(LLMCallFailedEvent)
+        def on_llm_failed(source, event):
+            finish_llm(event, error=event.error)
+
+        @crewai_event_bus.on(ToolUsageStartedEvent)
+        def on_tool_started(source, event):
+            run, agent_id = self._run_for_tool(event.agent_key)
+            if run is not None:
+                run.tool_started[(agent_id, threading.get_ident())] = time.perf_counter()
+
+        def finish_tool(event, error=None, from_cache=False):
+            run, agent_id = self._run_for_tool(event.agent_key)
+            if run is None:
+                return
+            start = run.tool_started.pop((agent_id, threading.get_ident()), None)
+            seconds = time.perf_counter() - start if start is not None else 0.0
+            with run.lock:
+                task_name = run.current_task.get(agent_id)
+                run.add(task_name, tool_calls=1, tool_seconds=seconds, errors=int(error is not None))
+            self._write(run, "tool_call", task=task_name, agent=event.agent_role, tool=event.tool_name,
+                        seconds=round(seconds, 3), from_cache=from_cache,
+                        attempt=event.run_attempts, error=None if error is None else str(error))
+
+        @crewai_event_bus.on(ToolUsageFinishedEvent)
+        def on_tool_finished(source, event):
+            finish_tool(event, from_cache=event.from_cache)
+
+        @crewai_event_bus.on(ToolUsageErrorEvent)
+        def on_tool_error(source, event):
+            finish_tool(event, error=event.error)
+
+        def finish_task(task, error=None):
+            agent = getattr(task, "agent", None)
+            run = self._run_for_agent(getattr(agent, "id", None))
+            if run is None:
+                return
+            name = task.name or str(task.id)
+            with run.lock:
+                totals = run.tasks.setdefault(name, _new_totals())
+                started = totals.pop("started", None)
+                seconds = time.perf_counter() - started if started is not None else 0.0
+                totals["seconds"] += seconds
+                record = {key: round(value, 3) if isinstance(value, float) else value for key, value in totals.items()}
+            self._write(run, "task", task=name, agent=agent.role, error=error, **record)
+
+        @crewai_event_bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            finish_task(event.task)
+
+        @crewai_event_bus.on(TaskFailedEvent)
+        def on_task_failed(source, event):
+            finish_task(event.task, error=event.error)
+
+        def finish_run(crew, error=None):
+            run = self._run_for_crew(crew)
+            if run is None or not run.active:
+                return
+            with run.lock:
+                run.active = False
+                run.restore_retries()
+                # Summing per-call deltas would count overlapping calls of one agent twice
+                prompt, completion = run.token_totals()
+                totals = dict(run.totals, seconds=run.elapsed(), prompt_tokens=prompt, completion_tokens=completion)
+                tasks = {name: dict(values) for name, values in run.tasks.items()}
+                stopped = run.stopped
+            totals = {key: round(value, 3) if isinstance(value, float) else value for key, value in totals.items()}
+            record = self._write(run, "run", inputs=run.inputs, budget=run.budget.as_dict(), stopped=stopped,
+                                 error=error, total_tokens=totals["prompt_tokens"] + totals["completion_tokens"],
+                                 **totals)
+            with self._lock:
+                # Batches kick off a crew per item; finished runs mustn't pile up here
+                if run in self._runs:
+                    self._runs.remove(run)
+            if self.echo:
+                print_summary(record, tasks)
+
+        @crewai_event_bus.on(CrewKickoffCompletedEvent)
+        def on_kickoff_completed(source, event):
+            finish_run(source)
+
+        @crewai_event_bus.on(CrewKickoffFailedEvent)
+        def on_kickoff_failed(source, event):
+            finish_run(source, error=event.error)
+
+
+def print_summary(run, tasks):
+    """Print a run record and its per-task totals as a table."""
+    status = f"stopped, {run['stopped']}" if run.get("stopped") else ("failed" if run.get("error") else "completed")
+    print(f"\nRun {run['run_id']} of {run['crew']} {status} in {run['seconds']:.1f}s\n")
+    print(f"{'task':>24} {'seconds':>8} {'llm':>5} {'llm s':>7} {'prompt':>9} {'compl.':>8} "
+          f"{'tools':>6} {'tool s':>7} {'steps':>6} {'retries':>8}")
+    rows = list(tasks.items()) + [("total", run)]
+    for name, row in rows:
+        print(f"{str(name)[:24]:>24} {row['seconds']:>8.1f} {row['llm_calls']:>5} {row['llm_seconds']:>7.1f} "
+              f"{row['prompt_tokens']:>9} {row['completion_tokens']:>8} {row['tool_calls']:>6} "
+              f"{row['tool_seconds']:>7.1f} {row['steps']:>6} {row['retries']:>8}")
+    budget = {key: value for key, value in (run.get("budget") or {}).items() if value is not None}
+    if budget:
+        used = {"tokens": run["total_tokens"], "seconds": run["seconds"], "tool_calls": run["tool_calls"]}
+        print("\nBudget: " + ", ".join(f"{key} {used[key]:g}/{limit:g}" for key, limit in budget.items()))
+
+
+def accounted(crew, budget=None):
+    """Record the crew's runs in the ledger at CREW_LEDGER (output/ledger.jsonl by default).
+
+    Without a budget, one is read from CREW_MAX_TOKENS, CREW_MAX_SECONDS and
+    CREW_MAX_TOOL_CALLS. Returns the crew.
+    """
+    ledger = Ledger.shared(os.getenv(LEDGER_ENV) or "output/ledger.jsonl")
+    return ledger.attach(crew, budget or Budget.from_env())
+
+
+def aggregate(paths):
+    """Totals of the "run" records in ledger files, grouped by crew."""
+    crews = defaultdict(lambda: defaultdict(float))
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if record.get("kind") != "run":
+                    continue
+                totals = crews[record["crew"]]
+                totals["runs"] += 1
+                totals["stopped"] += bool(record.get("stopped"))
+                totals["failed"] += bool(record.get("error")) and not record.get("stopped")
+                for key in ("seconds", "llm_calls", "prompt_tokens", "completion_tokens", "tool_calls", "retries"):
+                    totals[key] += record.get(key) or 0
+    return {crew: dict(totals) for crew, totals in crews.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise crew runs from JSON-lines ledgers")
+    parser.add_argument("paths", nargs="+", help="ledger files, e.g. output/ledger.jsonl")
+    args = parser.parse_args(argv)
+    print(f"{'crew':>24} {'runs':>5} {'stopped':>8} {'failed':>7} {'seconds':>9} {'llm':>6} {'prompt':>10} "
+          f"{'compl.':>9} {'tools':>6} {'retries':>8}")
+    for crew, t in sorted(aggregate(args.paths).items()):
+        print(f"{crew[:24]:>24} {t['runs']:>5.0f} {t['stopped']:>8.0f} {t['failed']:>7.0f} {t['seconds']:>9.1f} "
+              f"{t['llm_calls']:>6.0f} {t['prompt_tokens']:>10.0f} {t['completion_tokens']:>9.0f} "
+              f"{t['tool_calls']:>6.0f} {t['retries']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import time
+from datetime import datetime
+
+from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.events import TaskCompletedEvent, TaskStartedEvent
+from crewai.utilities.events.crewai_event_bus import crewai_event_bus
+
+MEMO_DIR_ENV = "CREW_MEMO_DIR"
+
+# Bump when the key recipe changes so old entries stop matching
+_KEY_VERSION = 2
+
+
+def _llm_settings(llm):
+    if llm is None or isinstance(llm, str):
+        return {"model": llm}
+    settings = {name: getattr(llm, name, None) for name in ("model", "temperature", "top_p", "max_tokens", "seed")}
+    # A routed LLM's model is only the agent's baseline; its fingerprint says which models answer
+    settings["fingerprint"] = getattr(llm, "fingerprint", None)
+    return settings
+
+
+def _schema(model):
+    return model.model_json_schema() if model is not None else None
+
+
+class MemoStore:
+    """Task outputs as JSON files named by the hash of everything that produced them."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def _file(self, key):
+        return os.path.join(self.path, f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._file(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, entry):
+        os.makedirs(self.path, exist_ok=True)
+        path = self._file(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path)
+
+
+class MemoTask(Task):
+    """A Task that reuses its stored output when nothing it depends on has changed.
+
+    The key hashes the interpolated description and expected output, the output format,
+    the agent's role, goal, backstory, LLM settings and tools, and the context built
+    from upstream outputs. Editing one task's prompt therefore re-runs that task and,
+    if its output changes, the tasks downstream of it, while earlier tasks come from
+    the store. Memoization is on only while CREW_MEMO_DIR names a store directory.
+    """
+
+    def memo_key(self, agent, context, tools):
+        agent = agent or self.agent
+        payload = {
+            "version": _KEY_VERSION,
+            "description": self.description,
+            "expected_output": self.expected_output,
+            "output_json": _schema(self.output_json),
+            "output_pydantic": _schema(self.output_pydantic),
+            "agent": {
+                "role": getattr(agent, "role", None),
+                "goal": getattr(agent, "goal", None),
+                "backstory": getattr(agent, "backstory", None),
+                "llm": _llm_settings(getattr(agent, "llm", None)),
+            },
+            "tools": sorted(tool.name for tool in (tools or self.tools or [])),
+            "context": context or "",
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _execute_core(self, agent, context, tools):
+        path = os.getenv(MEMO_DIR_ENV)
+        if not path:
+            return super()._execute_core(agent, context, tools)
+        store = MemoStore(path)
+        key = self.memo_key(agent, context, tools)
+        entry = store.get(key)
+        if entry is not None:
+            return self._replay(entry, agent, context)
+
+        start = time.perf_counter()
+        output = super()._execute_core(agent, context, tools)
+        store.put(key, {
+            "name": self.name,
+            "raw": output.raw,
+            "json_dict": output.json_dict,
+            "pydantic": output.pydantic.model_dump() if output.pydantic is not None else None,
+            "seconds": round(time.perf_counter() - start, 3),
+            "created": datetime.now().isoformat(timespec="seconds"),
+        })
+        return output
+
+    def _replay(self, entry, agent, context):
+        # Mirrors the bookkeeping of Task._execute_core so callbacks, listeners and output files behave the same
+        agent = agent or self.agent
+        self.agent = agent
+        self.start_time = datetime.now()
+        self.prompt_context = context
+        self.processed_by_agents.add(agent.role)
+        crewai_event_bus.emit(self, TaskStartedEvent(context=context, task=self))
+        pydantic_output = None
+        if entry["pydantic"] is not None and self.output_pydantic is not None:
+            pydantic_output = self.output_pydantic.model_validate(entry["pydantic"])
+        output = TaskOutput(
+            name=self.name,
+            description=self.description,
+            expected_output=self.expected_output,
+            raw=entry["raw"],
+            pydantic=pydantic_output,
+            json_dict=entry["json_dict"],
+            agent=agent.role,
+            output_format=self._get_output_format(),
+        )
+        self.output = output
+        self.end_time = datetime.now()
+        if self.callback:
+            self.callback(output)
+        crew = agent.crew
+        if crew and crew.task_callback and crew.task_callback != self.callback:
+            crew.task_callback(output)
+        if self.output_file:
+            self._save_file(output.json_dict or (pydantic_output.model_dump_json() if pydantic_output else output.raw))
+        crewai_event_bus.emit(self, TaskCompletedEvent(output=output, task=self))
+        print(f"Reused {self.name or 'task'} output from {entry['created']}, "
+              f"saving about {entry['seconds']:.1f}s", flush=True)
+        return output
@@ -0,0 +1,290 @@
+import hashlib
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from datetime import datetime
+
+import yaml
+from crewai import LLM
+from litellm.integrations.custom_logger import CustomLogger
+
+ROUTING_ENV = "CREW_ROUTING"
+
+_FENCE = re.compile(r"^```[a-zA-Z]*\s*|\s*```$")
+
+
+def _estimate_tokens(messages):
+    # About four characters per token is close enough to pick a tier
+    if isinstance(messages, str):
+        return len(messages) // 4
+    return sum(len(str(message.get("content") or "")) for message in messages) // 4
+
+
+def _usage_tokens(usage, name):
+    value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+    return value or 0
+
+
+class _CallUsage(CustomLogger):
+    """The tokens of one LLM call.
+
+    crewAI's LLM.call reports the call's own usage to its callbacks as {"usage": ...}, and
+    also installs them as litellm's global callbacks, which calls on other threads then
+    report to with their ModelResponse. Only the former is counted, so concurrent calls
+    never add to each other's counts.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        if isinstance(response_obj, dict) and response_obj.get("usage"):
+            self.prompt_tokens += _usage_tokens(response_obj["usage"], "prompt_tokens")
+            self.completion_tokens += _usage_tokens(response_obj["usage"], "completion_tokens")
+
+
+class Tier:
+    """One rung of the model ladder, loaded from a crew's config/tiers.yaml."""
+
+    def __init__(self, name, model, max_prompt_tokens=None, **settings):
+        self.name = name
+        self.model = model
+        self.max_prompt_tokens = max_prompt_tokens
+        # Anything else (max_tokens, temperature, ...) is passed to the tier's LLM
+        self.settings = settings
+
+    def fits(self, prompt_tokens):
+        return self.max_prompt_tokens is None or prompt_tokens <= self.max_prompt_tokens
+
+    def describe(self):
+        return {"name": self.name, "model": self.model, "max_prompt_tokens": self.max_prompt_tokens,
+                "settings": self.settings}
+
+
+class ModelRouter:
+    """Sends each LLM call to the cheapest tier that suits its task, escalating on bad output.
+
+    Tiers are ordered cheapest first. A call starts at the tier its task declares with
+    `tier:` in tasks.yaml, passed in as task_tiers by task name (default_tier for tasks
+    without one), moving up past any tier whose max_prompt_tokens the prompt exceeds.
+    If the response is empty, stops at the tier's max_tokens, or has a Final Answer that
+    doesn't fit the task's output_pydantic or output_json schema, the call is repeated
+    on the next tier up. The last tier's answer is returned whatever it is.
+
+    With CREW_ROUTING=off every call goes to the agent's own model instead, still timed
+    and counted, so the two modes' reports can be compared.
+    """
+
+    def __init__(self, tiers, task_tiers=None, default_tier=None, llm_factory=LLM, enabled=True):
+        if not tiers:
+            raise ValueError("At least one model tier is needed")
+        self.tiers = tiers
+        self.task_tiers = task_tiers or {}
+        self.default_tier = default_tier or tiers[0].name
+        self.llm_factory = llm_factory
+        self.enabled = enabled
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    @property
+    def fingerprint(self):
+        """A hash of everything that decides which model answers a call: the mode, tiers and task tiers."""
+        config = {"enabled": self.enabled, "tiers": [tier.describe() for tier in self.tiers],
+                  "task_tiers": self.task_tiers, "default_tier": self.default_tier}
+        return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    @classmethod
+    def from_yaml(cls, path, task_tiers=None, llm_factory=LLM):
+        with open(path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+        default_tier = config.pop("default_tier", None)
+        tiers = [Tier(name, **settings) for name, settings in config.items()]
+        return cls(tiers, task_tiers, default_tier, llm_factory, enabled=os.getenv(ROUTING_ENV, "on") != "off")
+
+    def _tier_llm(self, routed, tier):
+        # One LLM per tier and agent, so setting an agent's stop words doesn't race with other agents
+        with self._lock:
+            llm = routed.tier_llms.get(tier.name)
+            if llm is None:
+                llm = routed.tier_llms[tier.name] = self.llm_factory(model=tier.model, **tier.settings)
+        llm.stop, llm.stream = routed.stop, routed.stream
+        return llm
+
+    def ladder(self, task, prompt_tokens):
+        """The tiers a call may use, from the first one it tries upwards."""
+        declared = self.task_tiers.get(getattr(task, "name", None)) or self.default_tier
+        names = [tier.name for tier in self.tiers]
+        if declared not in names:
+            raise ValueError(f"Unknown model tier {declared!r}, expected one of {', '.join(names)}")
+        ladder = self.tiers[names.index(declared):]
+        for i, tier in enumerate(ladder):
+            if tier.fits(prompt_tokens):
+                return ladder[i:]
+        return ladder[-1:]
+
+    def check(self, tier, response, completion_tokens, task):
+        """Why a response should go to the next tier, or None if it's good enough."""
+        if not isinstance(response, str):
+            # The result of a native tool call, nothing to judge
+            return None
+        if not response.strip():
+            return "empty"
+        max_tokens = tier.settings.get("max_tokens")
+        if max_tokens and completion_tokens >= max_tokens:
+            return "truncated"
+        schema = getattr(task, "output_pydantic", None) or getattr(task, "output_json", None)
+        if schema is not None and "Final Answer:" in response:
+            answer = _FENCE.sub("", response.split("Final Answer:", 1)[1].strip())
+            try:
+                schema.model_validate_json(answer)
+            except ValueError:
+                return "schema"
+        return None
+
+    def _record(self, name, model, seconds, usage, escalated):
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                "model": model, "calls": 0, "escalated": 0, "latencies": [],
+                "prompt_tokens": 0, "completion_tokens": 0,
+            })
+            stats["calls"] += 1
+            stats["escalated"] += escalated
+            stats["latencies"].append(seconds)
+            stats["prompt_tokens"] += usage.prompt_tokens
+            stats["completion_tokens"] += usage.completion_tokens
+
+    def reset(self):
+        """Forget the calls recorded so far, at the start of a kickoff."""
+        with self._lock:
+            self._stats.clear()
+
+    def _timed_call(self, llm, messages, callbacks, kwargs):
+        # A token counter of our own, next to the agent's, to split usage by tier
+        usage = _CallUsage()
+        start = time.perf_counter()
+        response = llm.call(messages, callbacks=[*(callbacks or []), usage], **kwargs)
+        return response, time.perf_counter() - start, usage
+
+    def call(self, routed, messages, callbacks=None, **kwargs):
+        if not self.enabled:
+            # The agent's own LLM, which no other agent calls
+            baseline = routed.baseline
+            baseline.stop, baseline.stream = routed.stop, routed.stream
+            response, seconds, usage = self._timed_call(baseline, messages, callbacks, kwargs)
+            self._record("baseline", baseline.model, seconds, usage, False)
+            return response
+
+        task = kwargs.get("from_task")
+        prompt_tokens = _estimate_tokens(messages)
+        ladder = self.ladder(task, prompt_tokens)
+        for i, tier in enumerate(ladder):
+            llm = self._tier_llm(routed, tier)
+            response, seconds, usage = self._timed_call(llm, messages, callbacks, kwargs)
+            completion_tokens = usage.completion_tokens or len(str(response)) // 4
+            problem = self.check(tier, response, completion_tokens, task) if i < len(ladder) - 1 else None
+            self._record(tier.name, tier.model, seconds, usage, problem is not None)
+            if problem is None:
+                return response
+            print(f"{tier.name} tier ({tier.model}) gave a {problem} response for "
+                  f"{getattr(task, 'name', None) or 'a task'}, escalating to {ladder[i + 1].name}", flush=True)
+        return response
+
+    def report(self):
+        with self._lock:
+            stats = {name: dict(values, latencies=list(values["latencies"])) for name, values in self._stats.items()}
+        tiers = {}
+        for name, values in stats.items():
+            latencies = sorted(values.pop("latencies"))
+            tiers[name] = dict(
+                values,
+                seconds=round(sum(latencies), 3),
+                p50_seconds=round(statistics.median(latencies), 3),
+                max_seconds=round(latencies[-1], 3),
+                total_tokens=values["prompt_tokens"] + values["completion_tokens"],
+            )
+        return {
+            "mode": "routed" if self.enabled else "baseline",
+            "calls": sum(t["calls"] for t in tiers.values()),
+            "escalated": sum(t["escalated"] for t in tiers.values()),
+            "llm_seconds": round(sum(t["seconds"] for t in tiers.values()), 3),
+            "total_tokens": sum(t["total_tokens"] for t in tiers.values()),
+            "tiers": tiers,
+        }
+
+
+class RoutedLLM(LLM):
+    """An agent's LLM that hands every call to a ModelRouter.
+
+    Keeps the agent's own LLM as `baseline`, whose model crewAI still sees for context
+    window and function-calling checks. That model doesn't say which models answer, so
+    `fingerprint` covers the router's configuration too, for caches keyed on the LLM.
+    """
+
+    def __init__(self, router, baseline):
+        super().__init__(model=baseline.model)
+        self.router = router
+        self.baseline = baseline
+        self.tier_llms = {}
+
+    @property
+    def fingerprint(self):
+        # With routing off the baseline answers, so its settings count too
+        baseline = {name: getattr(self.baseline, name, None) for name in ("model", "temperature", "top_p", "max_tokens")}
+        config = {"router": self.router.fingerprint, "baseline": baseline}
+        return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        return self.router.call(self, messages, callbacks=callbacks, tools=tools,
+                                available_functions=available_functions, from_task=from_task, from_agent=from_agent)
+
+
+def print_report(report):
+    wall = f"{report['wall_seconds']:.1f}s, " if report.get("wall_seconds") is not None else ""
+    print(f"\nModel routing ({report['mode']}): {wall}{report['calls']} calls, {report['escalated']} escalated, "
+          f"{report['llm_seconds']:.1f}s in LLM calls, {report['total_tokens']} tokens\n")
+    print(f"{'tier':>10} {'model':>24} {'calls':>6} {'escal.':>6} {'seconds':>8} {'p50':>7} {'max':>7} "
+          f"{'prompt':>9} {'compl.':>8}")
+    for name, tier in report["tiers"].items():
+        print(f"{name:>10} {tier['model']:>24} {tier['calls']:>6} {tier['escalated']:>6} {tier['seconds']:>8.1f} "
+              f"{tier['p50_seconds']:>7.2f} {tier['max_seconds']:>7.2f} {tier['prompt_tokens']:>9} "
+              f"{tier['completion_tokens']:>8}")
+
+
+def routed(crew, tiers_path, tasks_config, llm_factory=LLM, report_path="output/routing.jsonl"):
+    """Route the crew's agents through the tiers in tiers_path. Returns the crew.
+
+    tasks_config is the crew's loaded tasks.yaml, whose `tier:` keys crewAI's Task drops.
+    After each kickoff the per-tier report is printed and appended to report_path as
+    one JSON line, so routed and baseline runs can be compared.
+    """
+    task_tiers = {name: config.get("tier") for name, config in tasks_config.items() if config.get("tier")}
+    router = ModelRouter.from_yaml(tiers_path, task_tiers, llm_factory)
+    for agent in crew.agents:
+        if isinstance(agent.llm, LLM) and not isinstance(agent.llm, RoutedLLM):
+            agent.llm = RoutedLLM(router, agent.llm)
+
+    started = []
+
+    def start_clock(inputs):
+        # Each kickoff's report covers its own calls only
+        router.reset()
+        started.append(time.perf_counter())
+        return inputs
+
+    def write_report(output):
+        report = dict(router.report(), crew=crew.name, finished=datetime.now().isoformat(timespec="seconds"),
+                      wall_seconds=round(time.perf_counter() - started[-1], 3) if started else None)
+        print_report(report)
+        os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+        with open(report_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
+        return output
+
+    crew.before_kickoff_callbacks.append(start_clock)
+    crew.after_kickoff_callbacks.append(write_report)
+    return crew
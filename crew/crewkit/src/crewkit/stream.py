@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from crewai.utilities.events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+from crewai.utilities.events.base_event_listener import BaseEventListener
+from crewai.utilities.events.llm_events import LLMStreamChunkEvent
+
+STREAM_ENV = "CREW_STREAM"
+
+
+def _final_content(output):
+    # The same content Task._save_file writes for an output_file
+    if output.json_dict:
+        return json.dumps(output.json_dict, ensure_ascii=False, indent=2)
+    if output.pydantic is not None:
+        return output.pydantic.model_dump_json()
+    return output.raw
+
+
+def _write_atomic(path, content):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+class _Stream:
+    """The state of one running task: its output file, partial file and timings."""
+
+    def __init__(self, task, output_file):
+        self.name = task.name or str(task.id)
+        self.agent = getattr(task.agent, "role", None)
+        self.output_file = output_file
+        self.partial_path = f"{output_file}.partial" if output_file else None
+        self.partial = None
+        self.start = time.perf_counter()
+        self.first_chunk = None
+        self.chunks = 0
+        if self.partial_path:
+            os.makedirs(os.path.dirname(self.partial_path) or ".", exist_ok=True)
+            self.partial = open(self.partial_path, "w", encoding="utf-8")
+
+    def close(self, keep_partial):
+        if self.partial is not None:
+            self.partial.close()
+            if not keep_partial:
+                try:
+                    os.remove(self.partial_path)
+                except OSError:
+                    pass
+
+
+class StreamingOutput(BaseEventListener):
+    """Streams the LLM tokens of a crew's tasks as they arrive.
+
+    While a task runs, its tokens are appended to `<output_file>.partial` and logged to a
+    JSON-lines event stream; crewAI's own console listener prints them as they arrive.
+    When the task completes, its final output replaces output_file in one atomic rename
+    and the partial file is removed; a failed task leaves its partial file behind.
+    Only crews passed to attach() stream.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, events_path="output/stream.jsonl"):
+        self.events_path = events_path
+        self._crews = set()
+        self._streams = {}
+        self._events = None
+        self._lock = threading.Lock()
+        super().__init__()
+
+    @classmethod
+    def shared(cls, events_path="output/stream.jsonl"):
+        # Listeners stay registered on crewAI's global event bus, so one per process
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(events_path)
+            return cls._shared
+
+    def attach(self, crew):
+        """Turn on streaming for the crew's agents and follow its tasks. Returns the crew."""
+        for agent in crew.agents:
+            if hasattr(agent.llm, "stream"):
+                agent.llm.stream = True
+        self._crews.add(crew.id)
+        return crew
+
+    def _follows(self, task):
+        crew = getattr(task.agent, "crew", None)
+        return crew is not None and crew.id in self._crews
+
+    def _emit(self, record):
+        record = {"ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"), **record}
+        with self._lock:
+            if self._events is None:
+                os.makedirs(os.path.dirname(self.events_path) or ".", exist_ok=True)
+                self._events = open(self.events_path, "a", encoding="utf-8", buffering=1)
+            self._events.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def setup_listeners(self, crewai_event_bus):
+        @crewai_event_bus.on(TaskStartedEvent)
+        def on_task_started(source, event):
+            task = event.task
+            if task is None or not self._follows(task):
+                return
+            stream = _Stream(task, task.output_file)
+            # Finalised by on_task_completed instead of Task._save_file's in-place write
+            task.output_file = None
+            self._streams[task.id] = stream
+            self._emit({"event": "task_started", "task": stream.name, "agent": stream.agent,
+                        "partial_file": stream.partial_path})
+
+        @crewai_event_bus.on(LLMStreamChunkEvent)
+        def on_chunk(source, event):
+            stream = self._streams.get(event.task_id) if event.task_id else None
+            if stream is None:
+                return
+            if event.tool_call is not None:
+                self._emit({"event": "tool_call", "task": stream.name, "agent": stream.agent,
+                            "tool": event.tool_call.function.name, "chunk": event.chunk})
+                return
+            if stream.first_chunk is None:
+                stream.first_chunk = time.perf_counter() - stream.start
+            stream.chunks += 1
+            if stream.partial is not None:
+                stream.partial.write(event.chunk)
+                stream.partial.flush()
+            self._emit({"event": "chunk", "task": stream.name, "agent": stream.agent, "chunk": event.chunk})
+
+        @crewai_event_bus.on(TaskCompletedEvent)
+        def on_task_completed(source, event):
+            stream = self._streams.pop(event.task.id, None) if event.task is not None else None
+            if stream is None:
+                return
+            event.task.output_file = stream.output_file
+            if stream.output_file:
+                _write_atomic(stream.output_file, _final_content(event.output))
+            stream.close(keep_partial=False)
+            self._emit({"event": "task_completed", "task": stream.name, "agent": stream.agent,
+                        "output_file": stream.output_file, "chunks": stream.chunks,
+                        "first_chunk_seconds": round(stream.first_chunk, 3) if stream.first_chunk is not None else None,
+                        "seconds": round(time.perf_counter() - stream.start, 3)})
+
+        @crewai_event_bus.on(TaskFailedEvent)
+        def on_task_failed(source, event):
+            stream = self._streams.pop(event.task.id, None) if event.task is not None else None
+            if stream is None:
+                return
+            event.task.output_file = stream.output_file
+            stream.close(keep_partial=True)
+            self._emit({"event": "task_failed", "task": stream.name, "agent": stream.agent,
+                        "error": event.error, "partial_file": stream.partial_path})
+
+
+def streamed(crew):
+    """Stream the crew's output when CREW_STREAM names an event stream file, else return it unchanged."""
+    path = os.getenv(STREAM_ENV)
+    if not path:
+        return crew
+    return StreamingOutput.shared(path).attach(crew)
@@ -0,0 +1,423 @@
+"""Tools that fetch data over HTTP, sharing one connection pool per process.
+
+PooledTool is a crewAI BaseTool whose requests go through a process-wide httpx client,
+so every agent and crew in the process reuses the same keep-alive connections instead
+of opening one per call. Each tool class has a concurrency limit, and identical GETs
+already in flight share one response. `_run` serves crewAI's agent threads; `_arun`
+does the same over an async client for code running in an event loop; await
+`aclose()` before that loop finishes to close its connections.
+
+The market data tools read from Polygon (POLYGON_API_KEY). To compare the pooled
+client with a new connection per call against a local stub server:
+
+    python -m crewkit.tools --calls 500 --threads 8
+"""
+import abc
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import statistics
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Type
+from urllib.parse import quote
+
+import httpx
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+POLYGON_API_KEY_ENV = "POLYGON_API_KEY"
+
+LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30)
+TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+
+class _Pool:
+    """The clients, concurrency limits and in-flight requests behind every PooledTool.
+
+    The sync side is shared by all threads. An httpx.AsyncClient and asyncio primitives
+    belong to one event loop, so the async side is kept per loop and goes with it.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self._client = None
+        self._limits = {}
+        self._inflight = {}
+        self._loops = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(limits=LIMITS, timeout=TIMEOUT)
+            return self._client
+
+    def limit(self, tool):
+        with self._lock:
+            key = type(tool)
+            if key not in self._limits:
+                self._limits[key] = threading.BoundedSemaphore(tool.max_concurrency)
+            return self._limits[key]
+
+    def loop_state(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.get(loop)
+            if state is None:
+                state = self._loops[loop] = {
+                    "client": httpx.AsyncClient(limits=LIMITS, timeout=TIMEOUT), "limits": {}, "inflight": {},
+                }
+            return state
+
+    def get(self, tool, url, params, headers):
+        key = _request_key(url, params, headers)
+        owner = False
+        with self._lock:
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.coalesced += 1
+            else:
+                pending = self._inflight[key] = Future()
+                owner = True
+        if not owner:
+            return pending.result()
+
+        try:
+            with self.limit(tool):
+                with self._lock:
+                    self.requests += 1
+                response = self.client().get(url, params=params, headers=headers)
+                response.raise_for_status()
+                data = response.json()
+            pending.set_result(data)
+            return data
+        except BaseException as e:
+            # Everyone waiting on this request sees the same error; nothing is remembered
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget(self, tool, url, params, headers):
+        state = self.loop_state()
+        key = _request_key(url, params, headers)
+        pending = state["inflight"].get(key)
+        if pending is not None:
+            with self._lock:
+                self.coalesced += 1
+            # shield, so one waiter being cancelled doesn't cancel the request for the rest
+            return await asyncio.shield(pending)
+
+        limit = state["limits"].get(type(tool))
+        if limit is None:
+            limit = state["limits"][type(tool)] = asyncio.Semaphore(tool.max_concurrency)
+
+        async def fetch():
+            async with limit:
+                with self._lock:
+                    self.requests += 1
+                response = await state["client"].get(url, params=params, headers=headers)
+                response.raise_for_status()
+                return response.json()
+
+        pending = state["inflight"][key] = asyncio.ensure_future(fetch())
+        pending.add_done_callback(lambda _: state["inflight"].pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            state = self._loops.pop(loop, None)
+        if state is not None:
+            await state["client"].aclose()
+
+    def stats(self):
+        with self._lock:
+            return {"requests": self.requests, "coalesced": self.coalesced}
+
+    def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+
+_pool = _Pool()
+atexit.register(_pool.close)
+
+
+def _request_key(url, params, headers):
+    return json.dumps([url, sorted((params or {}).items()), sorted((headers or {}).items())], default=str)
+
+
+def pool_stats():
+    """Requests sent and requests answered by one already in flight, since the process started."""
+    return _pool.stats()
+
+
+async def aclose():
+    """Close the running event loop's async client. The next `_arun` on the loop opens a new one."""
+    await _pool.aclose()
+
+
+class PooledTool(BaseTool):
+    """A BaseTool that GETs JSON from base_url through the process-wide connection pool.
+
+    Subclasses implement `_request(**kwargs)`, returning the path and query params for
+    the tool's arguments, and `_format(data, **kwargs)`, turning the JSON response into
+    the text the agent sees. At most max_concurrency requests of one tool class run at a
+    time (per event loop for `_arun`); the limit of the first instance created wins.
+    Responses are shared read-only between coalesced callers, so `_format` mustn't
+    modify them.
+    """
+
+    base_url: str = ""
+    max_concurrency: int = 8
+
+    @abc.abstractmethod
+    def _request(self, **kwargs):
+        """The path and query params to GET for the tool's arguments."""
+
+    def _format(self, data, **kwargs):
+        return json.dumps(data)
+
+    def _headers(self):
+        return {}
+
+    def get(self, path, params=None):
+        return _pool.get(self, self.base_url + path, params, self._headers())
+
+    async def aget(self, path, params=None):
+        return await _pool.aget(self, self.base_url + path, params, self._headers())
+
+    def _run(self, **kwargs):
+        path, params = self._request(**kwargs)
+        return self._format(self.get(path, params), **kwargs)
+
+    async def _arun(self, **kwargs):
+        path, params = self._request(**kwargs)
+        return self._format(await self.aget(path, params), **kwargs)
+
+
+class PolygonTool(PooledTool):
+    """A PooledTool reading from Polygon's REST API with the key in POLYGON_API_KEY."""
+
+    base_url: str = "https://api.polygon.io"
+    api_key: str = Field(default_factory=lambda: os.getenv(POLYGON_API_KEY_ENV, ""), exclude=True, repr=False)
+    # Polygon's plans allow few concurrent requests per key
+    max_concurrency: int = 4
+
+    def _headers(self):
+        if not self.api_key:
+            raise ValueError(f"{POLYGON_API_KEY_ENV} is not set")
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+
+class TickerSearchInput(BaseModel):
+    """Input schema for TickerSearchTool."""
+    company: str = Field(..., description="Company name, or part of it, to find the stock ticker for.")
+
+
+class TickerSearchTool(PolygonTool):
+    name: str = "Find stock ticker"
+    description: str = "Look up the stock ticker symbols of listed companies matching a company name."
+    args_schema: Type[BaseModel] = TickerSearchInput
+
+    def _request(self, company):
+        return "/v3/reference/tickers", {"search": company, "market": "stocks", "active": "true", "limit": 5}
+
+    def _format(self, data, company):
+        results = data.get("results") or []
+        if not results:
+            return f"No listed company matches {company!r}."
+        return "\n".join(f"{r.get('ticker')}: {r.get('name')} ({r.get('primary_exchange', 'unknown exchange')})"
+                         for r in results)
+
+
+def _symbol(ticker):
+    return quote(ticker.strip().upper(), safe="")
+
+
+class TickerInput(BaseModel):
+    """Input schema for tools that take a stock ticker."""
+    ticker: str = Field(..., description="Stock ticker symbol, e.g. AAPL.")
+
+
+class CompanyDetailsTool(PolygonTool):
+    name: str = "Company details"
+    description: str = ("Get a listed company's name, description, industry, market cap, employee count "
+                        "and listing date from its stock ticker.")
+    args_schema: Type[BaseModel] = TickerInput
+
+    def _request(self, ticker):
+        return f"/v3/reference/tickers/{_symbol(ticker)}", None
+
+    def _format(self, data, ticker):
+        r = data.get("results") or {}
+        fields = [
+            ("Name", r.get("name")), ("Ticker", r.get("ticker")), ("Exchange", r.get("primary_exchange")),
+            ("Industry", r.get("sic_description")),
+            ("Market cap", f"{r['market_cap']:,.0f}" if r.get("market_cap") else None),
+            ("Employees", r.get("total_employees")), ("Listed", r.get("list_date")),
+            ("Website", r.get("homepage_url")), ("Description", r.get("description")),
+        ]
+        lines = [f"{label}: {value}" for label, value in fields if value is not None]
+        return "\n".join(lines) or f"No details found for {ticker}."
+
+
+class PriceHistoryInput(TickerInput):
+    days: int = Field(30, description="How many calendar days of daily prices to summarise.")
+
+
+class PriceHistoryTool(PolygonTool):
+    name: str = "Stock price history"
+    description: str = ("Summarise a stock's daily closing prices and volume over the last given number of days: "
+                        "latest close, change, high, low and average volume.")
+    args_schema: Type[BaseModel] = PriceHistoryInput
+
+    def _request(self, ticker, days=30):
+        end = date.today()
+        start = end - timedelta(days=max(1, days))
+        return (f"/v2/aggs/ticker/{_symbol(ticker)}/range/1/day/{start}/{end}",
+                {"adjusted": "true", "sort": "asc", "limit": 5000})
+
+    def _format(self, data, ticker, days=30):
+        bars = data.get("results") or []
+        if not bars:
+            return f"No prices for {ticker} in the last {days} days."
+        first, last = bars[0], bars[-1]
+        change = (last["c"] - first["o"]) / first["o"] * 100 if first.get("o") else 0.0
+        return (f"{ticker.upper()} over {len(bars)} trading days to {date.fromtimestamp(last['t'] / 1000)}: "
+                f"close {last['c']:.2f}, change {change:+.1f}%, high {max(b['h'] for b in bars):.2f}, "
+                f"low {min(b['l'] for b in bars):.2f}, "
+                f"average volume {statistics.fmean(b.get('v', 0) for b in bars):,.0f}")
+
+
+class CompanyNewsInput(TickerInput):
+    limit: int = Field(10, description="How many of the latest articles to return.")
+
+
+class CompanyNewsTool(PolygonTool):
+    name: str = "Company news"
+    description: str = "Get the latest news articles about a company from its stock ticker, newest first."
+    args_schema: Type[BaseModel] = CompanyNewsInput
+
+    def _request(self, ticker, limit=10):
+        return "/v2/reference/news", {"ticker": ticker.strip().upper(), "limit": min(limit, 50),
+                                      "order": "desc", "sort": "published_utc"}
+
+    def _format(self, data, ticker, limit=10):
+        articles = data.get("results") or []
+        if not articles:
+            return f"No recent news for {ticker}."
+        return "\n\n".join(
+            f"{a.get('published_utc', '')[:10]} {a.get('title')} ({(a.get('publisher') or {}).get('name', '')})\n"
+            f"{a.get('description') or ''}".rstrip()
+            for a in articles
+        )
+
+
+def market_data_tools():
+    """Polygon's ticker search, company details, price history and news tools, or none without POLYGON_API_KEY."""
+    if not os.getenv(POLYGON_API_KEY_ENV):
+        return []
+    return [TickerSearchTool(), CompanyDetailsTool(), PriceHistoryTool(), CompanyNewsTool()]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Answers every GET with a small Polygon-shaped ticker response, keeping connections alive."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; don't let Nagle hold the body back
+    disable_nagle_algorithm = True
+    connections = 0
+    requests = 0
+    _lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with self._lock:
+            type(self).connections += 1
+
+    def do_GET(self):
+        with self._lock:
+            type(self).requests += 1
+        ticker = self.path.split("?")[0].rsplit("/", 1)[-1]
+        body = json.dumps({"status": "OK", "results": {"ticker": ticker, "name": f"{ticker} Inc.",
+                                                       "market_cap": 1e9, "total_employees": 100}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _bench(label, calls, run):
+    _StubHandler.connections = _StubHandler.requests = 0
+    start = time.perf_counter()
+    run()
+    seconds = time.perf_counter() - start
+    print(f"{label:>28} {calls:>6} {seconds:>8.2f} {seconds / calls * 1000:>8.2f} "
+          f"{_StubHandler.connections:>6} {_StubHandler.requests:>8}", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-call overhead of PooledTool against a local HTTP stub")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    tool = CompanyDetailsTool(base_url=base_url, api_key="stub", max_concurrency=args.threads)
+    tickers = [f"T{i}" for i in range(args.calls)]
+
+    def new_connection(ticker):
+        # What a tool calling httpx.get / requests.get directly does
+        response = httpx.get(f"{base_url}/v3/reference/tickers/{ticker}", headers=tool._headers())
+        response.raise_for_status()
+        return response.json()
+
+    async def gather():
+        try:
+            await asyncio.gather(*(tool._arun(ticker=t) for t in tickers))
+        finally:
+            await aclose()
+
+    async def gather_same():
+        try:
+            await asyncio.gather(*(tool._arun(ticker="SAME") for _ in tickers))
+        finally:
+            await aclose()
+
+    print(f"{'':>28} {'calls':>6} {'seconds':>8} {'ms/call':>8} {'conns':>6} {'requests':>8}")
+    _bench("new connection per call", args.calls, lambda: [new_connection(t) for t in tickers])
+    _bench("pooled", args.calls, lambda: [tool._run(ticker=t) for t in tickers])
+    with ThreadPoolExecutor(args.threads) as threads:
+        _bench(f"new connection, {args.threads} threads", args.calls,
+               lambda: list(threads.map(new_connection, tickers)))
+        _bench(f"pooled, {args.threads} threads", args.calls, lambda: list(threads.map(lambda t: tool._run(ticker=t), tickers)))
+        _bench(f"pooled, {args.threads} threads, same", args.calls,
+               lambda: list(threads.map(lambda _: tool._run(ticker="SAME"), tickers)))
+    _bench("async", args.calls, lambda: asyncio.run(gather()))
+    _bench("async, same request", args.calls, lambda: asyncio.run(gather_same()))
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
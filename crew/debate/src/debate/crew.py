@@ -1,8 +1,15 @@
+import os
+
 from crewai import Agent, Crew, Process, Task
+from crewkit.ledger import accounted
+from crewkit.routing import routed
+from crewkit.stream import streamed
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
 
+TIERS = os.path.join(os.path.dirname(__file__), "config", "tiers.yaml")
+
 
 @CrewBase
 class Debate():
@@ -15,6 +22,12 @@ class Debate():
     def debater(self) -> Agent:
         return Agent(config=self.agents_config['debater'], verbose=True)
 
+    @agent
+    def opposing_debater(self) -> Agent:
+        # oppose runs alongside propose, and an Agent can only work on one task at a time.
+        # Its role differs from the debater's because a Crew keeps one agent per role.
+        return Agent(config=self.agents_config['opposing_debater'], verbose=True)
+
     @agent
     def judge(self) -> Agent:
         return Agent(config=self.agents_config['judge'],verbose=True)
@@ -35,9 +48,9 @@ class Debate():
     def crew(self) -> Crew:
         """Creates the Debate crew"""
         
-        return Crew(
+        return streamed(accounted(routed(Crew(
             agents=self.agents, 
             tasks=self.tasks, 
             process=Process.sequential,
             verbose=True,
-        )
+        ), TIERS, self.tasks_config)))
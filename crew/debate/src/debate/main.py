@@ -1,9 +1,11 @@
 #!/usr/bin/env python
+import os
 import sys
 import warnings
 
 from datetime import datetime
 
+from crewkit.stream import STREAM_ENV
 from debate.crew import Debate
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
@@ -21,3 +23,12 @@ def run():
         Debate().crew().kickoff(inputs=inputs)
     except Exception as e:
         raise Exception(f"An error occurred while running the crew: {e}")
+
+
+def stream():
+    """
+    Run the crew, writing each task's tokens to its output file + ".partial" and to
+    output/stream.jsonl as they are generated.
+    """
+    os.environ.setdefault(STREAM_ENV, "output/stream.jsonl")
+    run()
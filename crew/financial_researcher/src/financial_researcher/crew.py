@@ -1,34 +1,62 @@
+import os
+
 from crewai import Agent, Crew, Process, Task
+from crewkit.ledger import accounted
+from crewkit.memo import MemoTask
+from crewkit.routing import routed
+from crewkit.stream import streamed
+from crewkit.tools import market_data_tools
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
-from crewai_tools import SerperDevTool
+from financial_researcher.tools.rate_limit import RateLimitedLLM
+from financial_researcher.tools.search_cache import CachedSerperDevTool, SearchCache
+
+TIERS = os.path.join(os.path.dirname(__file__), "config", "tiers.yaml")
 
 @CrewBase
 class ResearcherCrew():
     """Research crew for comprehensive topic analysis and reporting"""
 
+    def __init__(self, llm_bucket=None, search_bucket=None, search_cache=None, budget=None):
+        # Batch runs share these TokenBuckets across concurrent crews to stay under API rate limits
+        self.llm_bucket = llm_bucket
+        self.search_bucket = search_bucket
+        self.search_cache = search_cache or SearchCache.shared()
+        # Token, time and tool-call limits for each kickoff, from CREW_MAX_* when not given
+        self.budget = budget
+
+    def _llm(self, name):
+        if self.llm_bucket is None:
+            return self.agents_config[name]["llm"]
+        return RateLimitedLLM(model=self.agents_config[name]["llm"], bucket=self.llm_bucket)
+
+    def _tier_llm(self, model, **settings):
+        # The models the router picks share the crew's LLM rate limit too
+        return RateLimitedLLM(model=model, bucket=self.llm_bucket, **settings)
+
     @agent
     def researcher(self) -> Agent:
-        return Agent(config=self.agents_config["researcher"],verbose=True,tools=[SerperDevTool()])
+        search = CachedSerperDevTool(cache=self.search_cache, bucket=self.search_bucket)
+        return Agent(config=self.agents_config["researcher"],verbose=True,tools=[search, *market_data_tools()],llm=self._llm("researcher"))
     
     @agent
     def analyst(self) -> Agent:
-        return Agent(config=self.agents_config["analyst"],verbose=True)
+        return Agent(config=self.agents_config["analyst"],verbose=True,llm=self._llm("analyst"))
 
     @task
     def research_task(self) -> Task:
-        return Task(config=self.tasks_config["research_task"])
+        return MemoTask(config=self.tasks_config["research_task"])
     
     @task
     def analysis_task(self) -> Task:
-        return Task(config=self.tasks_config["analysis_task"],output_file="output/report2.md")
+        return MemoTask(config=self.tasks_config["analysis_task"])
     
     @crew
     def crew(self) -> Crew:
-        return Crew(
+        return streamed(accounted(routed(Crew(
             agents=self.agents,
             tasks=self.tasks,
             process=Process.sequential,
             verbose=True
-        )
\ No newline at end of file
+        ), TIERS, self.tasks_config, llm_factory=self._tier_llm), self.budget))
\ No newline at end of file
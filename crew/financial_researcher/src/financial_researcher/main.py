@@ -1,10 +1,21 @@
 #!/usr/bin/env python
+import argparse
+import re
+import statistics
 import sys
+import time
 import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import os
 
+from crewkit.ledger import Budget
+from crewkit.memo import MEMO_DIR_ENV
+from crewkit.stream import STREAM_ENV
+from crewkit.tools import pool_stats
 from financial_researcher.crew import ResearcherCrew
+from financial_researcher.tools.rate_limit import TokenBucket
+from financial_researcher.tools.search_cache import SearchCache
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -15,7 +26,8 @@ def run():
     """Run the research crew"""
 
     inputs = {
-        "company": "Tesla"
+        "company": "Tesla",
+        "report_name": "report2"
     }
 
     result = ResearcherCrew().crew().kickoff(inputs=inputs)
@@ -23,6 +35,118 @@ def run():
     print("\n\n Final Report \n\n")
     print(result.raw)
     print("\n\nReport has been saved to output/report2.md")
+    print_search_stats()
+
+
+def stream():
+    """Run the research crew, streaming each task's tokens to <output_file>.partial and output/stream.jsonl"""
+
+    os.environ.setdefault(STREAM_ENV, "output/stream.jsonl")
+    run()
+
+
+def iterate():
+    """Run the research crew, reusing stored outputs of tasks whose prompt, agent and upstream outputs are unchanged"""
+
+    os.environ.setdefault(MEMO_DIR_ENV, ".cache/memo")
+    run()
+
+
+def print_search_stats():
+    stats = SearchCache.shared().stats()
+    print(f"\nSearch cache: {stats['hits']} hits, {stats['shared_in_flight']} shared in flight, "
+          f"{stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), {stats['saved_seconds']}s of searching saved, "
+          f"{stats['entries']} entries, {stats['size_mb']} MB")
+    market = pool_stats()
+    if market["requests"] or market["coalesced"]:
+        print(f"Market data: {market['requests']} requests, {market['coalesced']} shared in flight")
+
+
+def report_name(company):
+    """The file name, without extension, of a company's report in output/."""
+    return re.sub(r"[^a-z0-9]+", "-", company.lower()).strip("-") or "company"
+
+
+def read_watchlist(path):
+    """Company names from a file, one per line. Blank lines and # comments are skipped."""
+    with open(path, "r", encoding="utf-8") as f:
+        companies = [line.split("#", 1)[0].strip() for line in f]
+    return list(dict.fromkeys(company for company in companies if company))
+
+
+def is_fresh(path, max_age_hours):
+    try:
+        return time.time() - os.path.getmtime(path) < max_age_hours * 3600
+    except OSError:
+        return False
+
+
+def research(company, llm_bucket, search_bucket, budget=None):
+    """Run one company's crew and return how long it took in seconds."""
+    start = time.perf_counter()
+    # A crew instance per company, so concurrent kickoffs don't share agents or tasks
+    ResearcherCrew(llm_bucket, search_bucket, budget=budget).crew().kickoff(inputs={
+        "company": company,
+        "report_name": report_name(company)
+    })
+    return time.perf_counter() - start
+
+
+def batch():
+    """Research every company on a watchlist, a few at a time, skipping fresh reports"""
+
+    parser = argparse.ArgumentParser(description="Research every company on a watchlist")
+    parser.add_argument("watchlist", nargs="?", default="watchlist.txt", help="file with one company per line")
+    parser.add_argument("--concurrency", type=int, default=4, help="crews running at once")
+    parser.add_argument("--llm-rpm", type=float, default=60, help="LLM calls per minute across all crews")
+    parser.add_argument("--search-rpm", type=float, default=30, help="Serper searches per minute across all crews")
+    parser.add_argument("--max-age-hours", type=float, default=20,
+                        help="reports newer than this are up to date and skipped")
+    parser.add_argument("--force", action="store_true", help="research every company, even with a fresh report")
+    parser.add_argument("--max-tokens", type=int, help="stop a company's crew after this many LLM tokens")
+    parser.add_argument("--max-seconds", type=float, help="stop a company's crew after this many seconds")
+    parser.add_argument("--max-tool-calls", type=int, help="stop a company's crew after this many tool calls")
+    args = parser.parse_args(sys.argv[1:])
+
+    companies = read_watchlist(args.watchlist)
+    pending = [c for c in companies
+               if args.force or not is_fresh(os.path.join("output", f"{report_name(c)}.md"), args.max_age_hours)]
+    print(f"{len(companies)} companies, {len(companies) - len(pending)} up to date, researching {len(pending)}")
+
+    llm_bucket = TokenBucket.per_minute(args.llm_rpm)
+    search_bucket = TokenBucket.per_minute(args.search_rpm)
+    limits = (args.max_tokens, args.max_seconds, args.max_tool_calls)
+    budget = Budget(*limits) if any(limit is not None for limit in limits) else None
+    latencies = {}
+    failures = {}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = {pool.submit(research, company, llm_bucket, search_bucket, budget): company for company in pending}
+        for future in as_completed(futures):
+            company = futures[future]
+            try:
+                latencies[company] = future.result()
+                print(f"Finished {company} in {latencies[company]:.1f}s")
+            except Exception as e:
+                # Leave the report stale so the next run picks the company up again
+                failures[company] = e
+                print(f"Failed {company}: {e}")
+    elapsed = time.perf_counter() - start
+
+    print("\n\nBatch Summary\n")
+    for company, latency in sorted(latencies.items(), key=lambda item: -item[1]):
+        print(f"{latency:8.1f}s  {company} -> output/{report_name(company)}.md")
+    for company, error in failures.items():
+        print(f"  failed  {company}: {error}")
+    if latencies:
+        values = list(latencies.values())
+        print(f"\nLatency per company: median {statistics.median(values):.1f}s, max {max(values):.1f}s")
+        print(f"Throughput: {len(latencies) / elapsed * 3600:.1f} companies per hour "
+              f"({len(latencies)} in {elapsed:.0f}s with concurrency {args.concurrency})")
+    print_search_stats()
+    print("Per-call tokens and latency are in output/ledger.jsonl; summarise with python -m crewkit.ledger")
+    if failures:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,59 @@
+import threading
+import time
+from typing import Any
+
+from crewai import LLM
+from crewai_tools import SerperDevTool
+from pydantic import Field
+
+
+class TokenBucket:
+    """A thread-safe token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, calls, burst=None):
+        return cls(calls / 60.0, burst)
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available and take them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimitedLLM(LLM):
+    """An LLM whose calls take a token from a bucket shared by every crew in the process."""
+
+    def __init__(self, model, bucket=None, **kwargs):
+        super().__init__(model=model, **kwargs)
+        self.bucket = bucket
+
+    def call(self, *args, **kwargs):
+        if self.bucket is not None:
+            self.bucket.acquire()
+        return super().call(*args, **kwargs)
+
+
+class RateLimitedSerperDevTool(SerperDevTool):
+    """SerperDevTool whose searches take a token from a shared bucket."""
+
+    bucket: Any = Field(default=None, exclude=True)
+
+    def _run(self, **kwargs):
+        if self.bucket is not None:
+            self.bucket.acquire()
+        return super()._run(**kwargs)
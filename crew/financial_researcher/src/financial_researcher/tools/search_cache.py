@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+from pydantic import Field
+
+from financial_researcher.tools.rate_limit import RateLimitedSerperDevTool
+
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", ".cache/search.sqlite")
+SEARCH_CACHE_TTL_HOURS = float(os.getenv("SEARCH_CACHE_TTL_HOURS", 24))
+
+# SerperDevTool settings that change what a search returns
+_PARAMS = ("search_type", "country", "location", "locale", "n_results", "save_file")
+
+
+def normalize_query(query):
+    return " ".join(str(query).lower().split()).rstrip("?.! ")
+
+
+class SearchCache:
+    """Search results in SQLite with a per-entry TTL, evicting least recently used past max_mb.
+
+    Concurrent lookups of the same key share one call to the underlying search.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path=SEARCH_CACHE_PATH, ttl_hours=SEARCH_CACHE_TTL_HOURS, max_mb=50):
+        self.path = path
+        self.ttl = ttl_hours * 3600
+        self.max_bytes = max_mb * 2 ** 20
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.saved_seconds = 0.0
+        self._inflight = {}
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY, query TEXT, value TEXT, seconds REAL, expires REAL, used REAL)""")
+
+    @classmethod
+    def shared(cls, path=SEARCH_CACHE_PATH):
+        """One cache per path for the whole process, so every crew shares its in-flight searches."""
+        with cls._shared_lock:
+            if path not in cls._shared:
+                cls._shared[path] = cls(path)
+            return cls._shared[path]
+
+    @staticmethod
+    def key(query, params):
+        payload = json.dumps({"query": normalize_query(query), "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get_or_search(self, key, query, search):
+        """The cached result for key, or search()'s result, stored for next time."""
+        now = time.time()
+        owner = False
+        with self._lock:
+            row = self._db.execute("SELECT value, seconds FROM results WHERE key = ? AND expires > ?",
+                                   (key, now)).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE results SET used = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                self.saved_seconds += row[1]
+                return json.loads(row[0])
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.shared += 1
+            else:
+                pending = self._inflight[key] = Future()
+                self.misses += 1
+                owner = True
+        if not owner:
+            return pending.result()
+
+        try:
+            start = time.perf_counter()
+            result = search()
+            seconds = time.perf_counter() - start
+            self._store(key, query, result, seconds)
+            pending.set_result(result)
+            return result
+        except BaseException as e:
+            # Failures aren't cached; everyone waiting on this search sees the error
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM results").fetchone()
+        lookups = self.hits + self.misses + self.shared
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "shared_in_flight": self.shared,
+            "hit_rate": (self.hits + self.shared) / lookups if lookups else 0.0,
+            "saved_seconds": round(self.saved_seconds, 1),
+            "entries": entries,
+            "size_mb": round(size / 2 ** 20, 2),
+        }
+
+    def _store(self, key, query, result, seconds):
+        try:
+            value = json.dumps(result)
+        except (TypeError, ValueError):
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                             (key, normalize_query(query), value, seconds, now + self.ttl, now))
+            self._db.execute("DELETE FROM results WHERE expires <= ?", (now,))
+            size = self._db.execute("SELECT COALESCE(SUM(LENGTH(value)), 0) FROM results").fetchone()[0]
+            if size > self.max_bytes:
+                # Drop the least recently used entries until back under the cap
+                excess = size - self.max_bytes
+                for old_key, length in self._db.execute(
+                        "SELECT key, LENGTH(value) FROM results ORDER BY used").fetchall():
+                    if excess <= 0:
+                        break
+                    self._db.execute("DELETE FROM results WHERE key = ?", (old_key,))
+                    excess -= length
+
+
+class CachedSerperDevTool(RateLimitedSerperDevTool):
+    """SerperDevTool answering repeated searches from a SearchCache. Only misses use the rate limit."""
+
+    cache: Any = Field(default=None, exclude=True)
+
+    def _run(self, **kwargs):
+        cache = self.cache or SearchCache.shared()
+        query = kwargs.get("search_query") or kwargs.get("query", "")
+        params = {name: getattr(self, name, None) for name in _PARAMS}
+        params.update({k: v for k, v in kwargs.items() if k not in ("search_query", "query")})
+        key = cache.key(query, params)
+        return cache.get_or_search(key, query, lambda: super(CachedSerperDevTool, self)._run(**kwargs))
@@ -1,7 +1,17 @@
+import os
+
 from crewai import Agent, Crew, Process, Task
+from crewkit.ledger import accounted
+from crewkit.memo import MemoTask
+from crewkit.routing import routed
+from crewkit.stream import streamed
+from crewkit.tools import market_data_tools
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
+
+TIERS = os.path.join(os.path.dirname(__file__), "config", "tiers.yaml")
+
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -23,6 +33,8 @@ class StockPicker():
     def researcher(self) -> Agent:
         return Agent(
             config=self.agents_config['researcher'], # type: ignore[index]
+            # Polygon ticker, price and news lookups when POLYGON_API_KEY is set
+            tools=market_data_tools(),
             verbose=True
         )
 
@@ -38,13 +50,13 @@ class StockPicker():
     # https://docs.crewai.com/concepts/tasks#overview-of-a-task
     @task
     def research_task(self) -> Task:
-        return Task(
+        return MemoTask(
             config=self.tasks_config['research_task'], # type: ignore[index]
         )
 
     @task
     def reporting_task(self) -> Task:
-        return Task(
+        return MemoTask(
             config=self.tasks_config['reporting_task'], # type: ignore[index]
             output_file='report.md'
         )
@@ -55,10 +67,10 @@ class StockPicker():
         # To learn how to add knowledge sources to your crew, check out the documentation:
         # https://docs.crewai.com/concepts/knowledge#what-is-knowledge
 
-        return Crew(
+        return streamed(accounted(routed(Crew(
             agents=self.agents, # Automatically created by the @agent decorator
             tasks=self.tasks, # Automatically created by the @task decorator
             process=Process.sequential,
             verbose=True,
             # process=Process.hierarchical, # In case you wanna use that instead https://docs.crewai.com/how-to/Hierarchical/
-        )
+        ), TIERS, self.tasks_config)))
@@ -1,9 +1,13 @@
 #!/usr/bin/env python
+import os
 import sys
 import warnings
 
 from datetime import datetime
 
+from crewkit.evaluate import evaluate
+from crewkit.memo import MEMO_DIR_ENV
+from crewkit.stream import STREAM_ENV
 from stock_picker.crew import StockPicker
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
@@ -28,6 +32,24 @@ def run():
         raise Exception(f"An error occurred while running the crew: {e}")
 
 
+def stream():
+    """
+    Run the crew, writing each task's tokens to its output file + ".partial" and to
+    output/stream.jsonl as they are generated.
+    """
+    os.environ.setdefault(STREAM_ENV, "output/stream.jsonl")
+    run()
+
+
+def iterate():
+    """
+    Run the crew, reusing the stored output of every task whose prompt, agent and
+    upstream outputs haven't changed since the last iterate.
+    """
+    os.environ.setdefault(MEMO_DIR_ENV, ".cache/memo")
+    run()
+
+
 def train():
     """
     Train the crew for a given number of iterations.
@@ -54,15 +76,17 @@ def replay():
 
 def test():
     """
-    Test the crew execution and returns the results.
+    Test the crew over several iterations run side by side, then summarise the scores.
+    Usage: test <n_iterations> <eval_llm> [workers]
     """
     inputs = {
         "topic": "AI LLMs",
         "current_year": str(datetime.now().year)
     }
-    
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
     try:
-        StockPicker().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
+        evaluate("stock_picker.crew:StockPicker", int(sys.argv[1]), sys.argv[2], inputs=inputs, workers=workers)
 
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
@@ -0,0 +1,259 @@
+"""The deep research pipeline from oagents4.ipynb, bounded so it scales with HOW_MANY_SEARCHES.
+
+The planner picks the searches. At most `concurrency` of them run at once, each with its
+own timeout. The search stage as a whole has a deadline: any searches still running
+then are cancelled, and the report is written from the ones that finished. Summaries go
+to the writer stage as they come in. With more of them than fit one writer prompt, they
+are condensed batch_size at a time into notes while the remaining searches run. The
+writer then gets those notes rather than every summary, so its prompt stays about the
+same size whether there are 3 searches or 50.
+
+    from research_pipeline import run
+    report = await run("What is Ansible?", how_many=50)
+
+or from a shell: python research_pipeline.py "What is Ansible?" --searches 50
+"""
+import argparse
+import asyncio
+import time
+from contextlib import aclosing
+from dataclasses import dataclass
+
+from agents import Agent, Runner, WebSearchTool, trace
+from agents.model_settings import ModelSettings
+from pydantic import BaseModel, Field
+
+HOW_MANY_SEARCHES = 3
+
+SEARCH_CONCURRENCY = 5
+SEARCH_TIMEOUT = 60.0
+SEARCH_DEADLINE = 180.0
+BATCH_SIZE = 8
+
+SEARCH_INSTRUCTIONS = "You are a research assistant. Given a search term, you search the web for that term and \
+produce a concise summary of the results. The summary must 2-3 paragraphs and less than 300 \
+words. Capture the main points. Write succintly, no need to have complete sentences or good \
+grammar. This will be consumed by someone synthesizing a report, so it's vital you capture the \
+essence and ignore any fluff. Do not include any additional commentary other than the summary itself."
+
+NOTES_INSTRUCTIONS = (
+    "You are a research assistant condensing web search summaries for a senior researcher. "
+    "You will be provided with the original query and a batch of numbered search summaries.\n"
+    "Merge them into one set of markdown bullet notes of less than 400 words that keeps every fact, "
+    "figure, name and date relevant to the query, drops repetition and fluff, and says where "
+    "summaries disagree. Do not include any additional commentary other than the notes themselves."
+)
+
+WRITER_INSTRUCTIONS = (
+    "You are a senior researcher tasked with writing a cohesive report for a research query. "
+    "You will be provided with the original query, and some initial research done by a research assistant.\n"
+    "You should first come up with an outline for the report that describes the structure and "
+    "flow of the report. Then, generate the report and return that as your final output.\n"
+    "The final output should be in markdown format, and it should be lengthy and detailed. Aim "
+    "for 5-10 pages of content, at least 1000 words."
+)
+
+
+class WebSearchItem(BaseModel):
+    reason: str = Field(description="Your reasoning for why this search is important to the query.")
+    query: str = Field(description="The search term to use for the web search.")
+
+
+class WebSearchPlan(BaseModel):
+    searches: list[WebSearchItem] = Field(description="A list of web searches to perform to best answer the query.")
+
+
+class ReportData(BaseModel):
+    short_summary: str = Field(description="A short 2-3 sentence summary of the findings.")
+    markdown_report: str = Field(description="The final report")
+    follow_up_questions: str = Field(description="Suggested topics to research further")
+
+
+search_agent = Agent(
+    name="Search agent",
+    instructions=SEARCH_INSTRUCTIONS,
+    tools=[WebSearchTool(search_context_size="low")],
+    model="gpt-4.1-mini",
+    model_settings=ModelSettings(tool_choice="required"),
+)
+
+notes_agent = Agent(
+    name="NotesAgent",
+    instructions=NOTES_INSTRUCTIONS,
+    model="gpt-4.1-mini",
+)
+
+writer_agent = Agent(
+    name="WriterAgent",
+    instructions=WRITER_INSTRUCTIONS,
+    model="gpt-4.1-mini",
+    output_type=ReportData,
+)
+
+
+def planner_agent(how_many=HOW_MANY_SEARCHES):
+    return Agent(
+        name="PlannerAgent",
+        instructions=f"You are a helpful research assistant. Given a query, come up with a set of web searches \
+to perform to best answer the query. Output {how_many} terms to query for.",
+        model="gpt-4.1-mini",
+        output_type=WebSearchPlan,
+    )
+
+
+@dataclass
+class SearchResult:
+    item: WebSearchItem
+    summary: str | None = None
+    # "timeout", "deadline" or the exception, when there's no summary
+    error: str | None = None
+    seconds: float = 0.0
+
+
+async def plan_searches(query, how_many=HOW_MANY_SEARCHES):
+    """ Use the planner agent to plan which searches to run for the query """
+    print("Planning searches...")
+    result = await Runner.run(planner_agent(how_many), f"Query: {query}")
+    print(f"Will perform {len(result.final_output.searches)} searches")
+    return result.final_output
+
+
+async def search(item, semaphore, timeout=SEARCH_TIMEOUT):
+    """ Run one planned search with the search agent, waiting for a free slot first """
+    input = f"Search item: {item.query}\n Reason for searching: {item.reason}"
+    async with semaphore:
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(timeout):
+                result = await Runner.run(search_agent, input)
+        except TimeoutError:
+            return SearchResult(item, error="timeout", seconds=time.monotonic() - start)
+        except Exception as e:
+            return SearchResult(item, error=f"{type(e).__name__}: {e}", seconds=time.monotonic() - start)
+    return SearchResult(item, summary=str(result.final_output), seconds=time.monotonic() - start)
+
+
+async def perform_searches(search_plan, concurrency=SEARCH_CONCURRENCY, timeout=SEARCH_TIMEOUT,
+                           deadline=SEARCH_DEADLINE):
+    """ Yield a SearchResult for each planned search as it finishes, at most `concurrency` at a time.
+
+    Every search that finished by `deadline` seconds in is yielded with its result; the
+    ones still running then are cancelled and yielded with error "deadline".
+    """
+    print("Searching...")
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = {asyncio.create_task(search(item, semaphore, timeout)): item for item in search_plan.searches}
+    end = time.monotonic() + deadline
+    pending = set(tasks)
+    try:
+        while pending:
+            # Everything done when the wait returns is yielded, so no finished search is lost
+            done, pending = await asyncio.wait(pending, timeout=max(0.0, end - time.monotonic()),
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                yield task.result()
+        for task in pending:
+            task.cancel()
+        for task in pending:
+            yield SearchResult(tasks[task], error="deadline", seconds=deadline)
+    finally:
+        # Also reached when the caller stops early; don't leave searches running
+        for task in tasks:
+            task.cancel()
+    print("Finished Searching")
+
+
+def format_summaries(results):
+    return "\n\n".join(f"## {i}. {r.item.query}\n{r.summary}" for i, r in enumerate(results, 1))
+
+
+async def take_notes(query, sections):
+    """ Condense a batch of summaries (or earlier notes) into one set of notes with the notes agent """
+    input = f"Original query: {query}\n\nSearch summaries:\n\n{sections}"
+    result = await Runner.run(notes_agent, input)
+    return str(result.final_output)
+
+
+async def reduce_notes(query, notes, batch_size=BATCH_SIZE):
+    """ Condense notes batch_size at a time until one writer prompt's worth is left """
+    while len(notes) > batch_size:
+        batches = [notes[i:i + batch_size] for i in range(0, len(notes), batch_size)]
+        notes = await asyncio.gather(*(take_notes(query, "\n\n".join(batch)) for batch in batches))
+    return notes
+
+
+async def write_report(query, results, batch_size=BATCH_SIZE):
+    """ Write the report from an async stream of SearchResults, condensing batches while searches run """
+    print("Thinking about report...")
+    done, missed, pending, notes = [], [], [], []
+
+    async with aclosing(results):
+        async for result in results:
+            if result.summary is None:
+                missed.append(result)
+                print(f"Search {result.item.query!r} gave no summary: {result.error}")
+                continue
+            done.append(result)
+            pending.append(result)
+            # Only once there's more than one prompt's worth; until then the writer takes them as they are
+            if len(pending) > batch_size:
+                batch, pending = pending[:batch_size], pending[batch_size:]
+                notes.append(asyncio.create_task(take_notes(query, format_summaries(batch))))
+
+    if not done:
+        for task in notes:
+            task.cancel()
+        raise RuntimeError(f"None of the {len(missed)} searches finished")
+    if notes:
+        if len(pending) > 1:
+            notes.append(asyncio.create_task(take_notes(query, format_summaries(pending))))
+        notes = list(await asyncio.gather(*notes))
+        if len(pending) == 1:
+            # A lone summary is already shorter than a set of notes; condensing it would cost a call
+            notes.append(format_summaries(pending))
+        research = "\n\n".join(await reduce_notes(query, notes, batch_size))
+    else:
+        # Few enough summaries to hand the writer directly, as the notebook does
+        research = format_summaries(pending)
+
+    input = f"Original query: {query}\nSummarized search results:\n\n{research}"
+    if missed:
+        input += ("\n\nThese searches didn't finish in time, so their topics may be thinly covered: "
+                  + "; ".join(r.item.query for r in missed))
+    result = await Runner.run(writer_agent, input)
+    print(f"Finished writing report from {len(done)} searches ({len(missed)} missed)")
+    return result.final_output
+
+
+async def run(query, how_many=HOW_MANY_SEARCHES, concurrency=SEARCH_CONCURRENCY, timeout=SEARCH_TIMEOUT,
+              deadline=SEARCH_DEADLINE, batch_size=BATCH_SIZE):
+    """ Plan, search and write a ReportData for the query """
+    with trace("Research trace"):
+        print("Starting research...")
+        search_plan = await plan_searches(query, how_many)
+        results = perform_searches(search_plan, concurrency, timeout, deadline)
+        return await write_report(query, results, batch_size)
+
+
+def main(argv=None):
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Research a query with bounded, streaming searches")
+    parser.add_argument("query")
+    parser.add_argument("--searches", type=int, default=HOW_MANY_SEARCHES)
+    parser.add_argument("--concurrency", type=int, default=SEARCH_CONCURRENCY)
+    parser.add_argument("--timeout", type=float, default=SEARCH_TIMEOUT, help="seconds per search")
+    parser.add_argument("--deadline", type=float, default=SEARCH_DEADLINE, help="seconds for all searches")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    load_dotenv(override=True)
+    report = asyncio.run(run(args.query, args.searches, args.concurrency, args.timeout, args.deadline,
+                             args.batch_size))
+    print(report.markdown_report)
+
+
+if __name__ == "__main__":
+    main()